@@ -0,0 +1,4 @@
+"""Reproducible benchmarks for the figures quoted in the README and commit history.
+
+Run each from the repository root, e.g. ``python -m benchmarks.stylesheet``.
+"""
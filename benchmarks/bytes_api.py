@@ -0,0 +1,77 @@
+"""Latency of the in-memory API against a round trip through temporary files.
+
+Times ``convert_bytes`` and the path-based equivalent a web backend would
+otherwise use: write the EML to a temporary file, ``convert_eml_to_pdf`` it,
+read the PDF back and delete both files. Rendering is replaced with a fixed
+PDF by default so the difference, the file I/O, is not drowned out by it;
+``--render`` renders for real (needs WeasyPrint).
+
+    python -m benchmarks.bytes_api --emails 500
+"""
+
+import argparse
+import os
+import tempfile
+from contextlib import nullcontext
+from pathlib import Path
+from unittest import mock
+
+from src.eml_to_pdf import converter as converter_module
+from src.eml_to_pdf.converter import EMLToPDFConverter
+
+from .common import best_time, itinerary_email
+
+# About the size of a rendered itinerary
+FAKE_PDF = b"%PDF-1.7\n" + b"0" * 40_000
+
+
+def fake_render_pdf(self, html_content, target=None):
+    if target is None:
+        return FAKE_PDF
+    if isinstance(target, Path):
+        target.write_bytes(FAKE_PDF)
+    else:
+        target.write(FAKE_PDF)
+    return None
+
+
+def through_temp_files(converter: EMLToPDFConverter, eml: bytes, tmp_dir: str) -> bytes:
+    fd, eml_name = tempfile.mkstemp(suffix='.eml', dir=tmp_dir)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(eml)
+    eml_path = Path(eml_name)
+    pdf_path = converter.convert_eml_to_pdf(eml_path)
+    try:
+        return pdf_path.read_bytes()
+    finally:
+        eml_path.unlink()
+        pdf_path.unlink()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--emails', type=int, default=500, help="conversions timed per variant")
+    parser.add_argument('--render', action='store_true', help="render for real instead of a fixed PDF")
+    parser.add_argument('--dir', type=Path, help="directory for the temporary files (default: the system temp dir)")
+    args = parser.parse_args()
+
+    # Progress output is not part of either API's cost
+    converter_module.console.quiet = True
+    converter = EMLToPDFConverter(offline=True)
+    eml = itinerary_email()
+    render = nullcontext() if args.render else mock.patch.object(EMLToPDFConverter, 'render_pdf', fake_render_pdf)
+    with render, tempfile.TemporaryDirectory(dir=args.dir) as tmp_dir:
+        converter.convert_bytes(eml)
+        timings = {}
+        for name, convert in (
+            ("convert_bytes", lambda: converter.convert_bytes(eml)),
+            ("temp files + convert_eml_to_pdf", lambda: through_temp_files(converter, eml, tmp_dir)),
+        ):
+            timings[name] = best_time(lambda: [convert() for _ in range(args.emails)], 3) / args.emails
+            print(f"{name:>32}: {timings[name] * 1000:7.3f} ms per email")
+    overhead = timings["temp files + convert_eml_to_pdf"] - timings["convert_bytes"]
+    print(f"{'temp-file overhead':>32}: {overhead * 1000:7.3f} ms per email")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+"""Helpers shared by the benchmarks: timing and generated itinerary emails."""
+
+import time
+from email.message import EmailMessage
+from pathlib import Path
+from typing import Callable
+
+GOLDEN_DIR = Path(__file__).resolve().parent.parent / "tests" / "golden"
+
+
+def best_time(func: Callable[[], object], repeat: int = 5) -> float:
+    """Fastest of ``repeat`` calls in seconds, to keep scheduling noise out."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def itinerary_body() -> str:
+    """A real-shaped Amadeus itinerary body with two flights."""
+    return (GOLDEN_DIR / "two_flights.txt").read_text(encoding='utf-8')
+
+
+def itinerary_email(body: str = "", cte: str = "quoted-printable") -> bytes:
+    """An itinerary email whose text/plain body is ``body`` (the golden itinerary by default)."""
+    msg = EmailMessage()
+    msg['Subject'] = "DOE/JOHN MR 27AUG2025 KEF HND"
+    msg['From'] = "itinerary@example.com"
+    msg['Date'] = "Sat, 12 Jul 2025 10:00:00 +0000"
+    msg['Message-ID'] = "<benchmark@example.com>"
+    msg.set_content(body or itinerary_body(), cte=cte)
+    return msg.as_bytes()
@@ -0,0 +1,41 @@
+"""Throughput of the extraction stage (--format jsonl) on typical itinerary emails.
+
+Writes a directory of itinerary emails and times ``extract_records`` over
+it, as ``--format jsonl`` runs it: MIME decoding and the booking and flight
+parsers, no rendering. Records go to memory, so disk writes are left out.
+
+    python -m benchmarks.extract --emails 2000 --jobs 1
+"""
+
+import argparse
+import io
+import tempfile
+from pathlib import Path
+
+from src.eml_to_pdf import converter as converter_module
+from src.eml_to_pdf.converter import EMLToPDFConverter
+
+from .common import best_time, itinerary_body, itinerary_email
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--emails', type=int, default=2000)
+    parser.add_argument('--jobs', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    # Progress output is not part of the extraction cost
+    converter_module.console.quiet = True
+    converter = EMLToPDFConverter()
+    with tempfile.TemporaryDirectory() as tmp:
+        input_dir = Path(tmp)
+        for index in range(args.emails):
+            body = itinerary_body().replace('ABC123', f"AB{index:04d}")
+            (input_dir / f"{index:05d}.eml").write_bytes(itinerary_email(body))
+        elapsed = best_time(lambda: converter.extract_records(input_dir, io.StringIO(), jobs=args.jobs), args.repeat)
+    print(f"extraction, {args.jobs} job(s): {args.emails / elapsed:8.0f} emails per second")
+
+
+if __name__ == '__main__':
+    main()
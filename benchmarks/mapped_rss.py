@@ -0,0 +1,123 @@
+"""Peak memory of parsing large emails: read into bytes, memory-mapped, and streaming MIME.
+
+Generates an itinerary email with a large attachment, and an mbox of
+several such messages, then parses them in a fresh child process per
+variant. Reports the child's peak RSS (from ``os.wait4``) above that of a
+child that only imports the converter, and, from a second run under
+tracemalloc, the peak of the Python heap. Pages of a mapped file count
+towards RSS while they are read, but they are page cache the kernel can
+drop, not heap copies, so the mapping shows up in the heap column. Unix only.
+
+    python -m benchmarks.mapped_rss --megabytes 64
+"""
+
+import argparse
+import mailbox
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+from email.message import EmailMessage
+from pathlib import Path
+
+from .common import itinerary_body
+
+VARIANTS = {
+    'import only': "",
+    'eml: read + message_from_bytes': "email.message_from_bytes(path.read_bytes())",
+    'eml: memory-mapped': "EMLToPDFConverter().parse_eml_file(path)",
+    'eml: streaming MIME': "EMLToPDFConverter(mime_mode='streaming').parse_eml_file(path)",
+    'mbox: mailbox.mbox': "[message for message in mailbox.mbox(path)]",
+    'mbox: memory-mapped': (
+        "converter = EMLToPDFConverter()\n"
+        "for message in iter_mbox(path): converter.parse_mbox_message(message)"
+    ),
+    'mbox: streaming MIME': (
+        "converter = EMLToPDFConverter(mime_mode='streaming')\n"
+        "for message in iter_mbox(path): converter.parse_mbox_message(message)"
+    ),
+}
+
+CHILD_PRELUDE = (
+    "import email, mailbox, sys, tracemalloc\n"
+    "from pathlib import Path\n"
+    "from src.eml_to_pdf.converter import EMLToPDFConverter\n"
+    "from src.eml_to_pdf.mbox import iter_mbox\n"
+    "path = Path(sys.argv[1])\n"
+    "if sys.argv[2] == 'trace': tracemalloc.start()\n"
+)
+CHILD_EPILOGUE = "\nif sys.argv[2] == 'trace': print(tracemalloc.get_traced_memory()[1])\n"
+
+
+def large_email(megabytes: float) -> bytes:
+    msg = EmailMessage()
+    msg['Subject'] = "DOE/JOHN MR 27AUG2025 KEF HND"
+    msg['From'] = "itinerary@example.com"
+    msg.set_content(itinerary_body())
+    msg.add_attachment(os.urandom(int(megabytes * 1024 * 1024)), maintype='application', subtype='pdf', filename='scan.pdf')
+    return msg.as_bytes()
+
+
+def generate(eml_path: Path, mbox_path: Path, megabytes: float, mbox_messages: int) -> None:
+    eml_path.write_bytes(large_email(megabytes))
+    box = mailbox.mbox(mbox_path)
+    for _ in range(mbox_messages):
+        box.add(large_email(megabytes))
+    box.close()
+
+
+def run_child(code: str, path: Path, mode: str) -> tuple[float, str]:
+    """Run ``code`` in a fresh interpreter; return its peak RSS in MB and its output."""
+    process = subprocess.Popen(
+        [sys.executable, "-c", CHILD_PRELUDE + code + CHILD_EPILOGUE, str(path), mode],
+        cwd=Path(__file__).resolve().parent.parent,
+        stdout=subprocess.PIPE,
+    )
+    output = process.stdout.read().decode()
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode:
+        raise RuntimeError(f"benchmark child failed with exit code {process.returncode}")
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return usage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024), output
+
+
+def measure(code: str, path: Path) -> tuple[float, float]:
+    """Peak RSS and peak traced heap of ``code``, in MB."""
+    rss, _ = run_child(code, path, 'rss')
+    _, output = run_child(code, path, 'trace')
+    return rss, int(output) / 1024 / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--megabytes', type=float, default=64, help="attachment size of the single email")
+    parser.add_argument('--mbox-messages', type=int, default=4, help="messages in the mbox, each this size")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        eml_path = Path(tmp) / "large.eml"
+        mbox_path = Path(tmp) / "large.mbox"
+        # Generated in another process: a child's peak RSS counts the memory
+        # of this process at fork time, so it must never hold the emails
+        generator = multiprocessing.get_context('spawn').Process(
+            target=generate, args=(eml_path, mbox_path, args.megabytes, args.mbox_messages)
+        )
+        generator.start()
+        generator.join()
+        print(f"email: {eml_path.stat().st_size / 1024 / 1024:.0f} MB, mbox: {mbox_path.stat().st_size / 1024 / 1024:.0f} MB")
+
+        baseline, _ = measure(VARIANTS['import only'], eml_path)
+        print(f"{'import only':>32}: {baseline:7.0f} MB peak RSS")
+        print(f"{'':>32}  {'RSS above import':>17}  {'heap peak':>10}")
+        for name, code in VARIANTS.items():
+            if name == 'import only':
+                continue
+            path = mbox_path if name.startswith('mbox') else eml_path
+            rss, heap = measure(code, path)
+            print(f"{name:>32}: {rss - baseline:14.0f} MB  {heap:7.0f} MB")
+
+
+if __name__ == '__main__':
+    main()
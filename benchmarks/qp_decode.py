@@ -0,0 +1,66 @@
+"""Text extraction from a large quoted-printable body: the old triple decode against the single pass.
+
+The old path is the ``extract_text_content`` the converter used to have:
+after ``get_payload(decode=True)`` it ran ``quopri.decodestring`` again, then
+stripped soft line breaks and replaced every ``=XX`` with a ``re.sub``
+callback. The new path decodes each part once.
+
+    python -m benchmarks.qp_decode --megabytes 20
+"""
+
+import argparse
+import email.message
+import quopri
+import re
+
+from src.eml_to_pdf.converter import EMLToPDFConverter
+
+from .common import best_time, itinerary_body, itinerary_email
+
+
+def old_extract_text(msg: email.message.Message) -> str:
+    plain_text = ""
+    for part in msg.walk():
+        if part.get_content_type() != "text/plain":
+            continue
+        charset = part.get_content_charset() or 'utf-8'
+        encoding = part.get('Content-Transfer-Encoding', '').lower()
+        raw_payload = part.get_payload(decode=True)
+        if raw_payload:
+            if encoding == 'quoted-printable':
+                decoded_text = quopri.decodestring(raw_payload).decode(charset, errors='ignore')
+            else:
+                decoded_text = raw_payload.decode(charset, errors='ignore')
+            decoded_text = decoded_text.replace('=\n', '')
+            decoded_text = re.sub(r'=([0-9A-F]{2})', lambda m: chr(int(m.group(1), 16)), decoded_text)
+            plain_text += decoded_text
+    return plain_text
+
+
+def large_body(megabytes: float) -> str:
+    # Accented names and long lines, so the encoding has escapes and soft breaks
+    section = itinerary_body() + "PASSENGER: MÜLLER/JOSÉ MR " + "REMARK " * 20 + "\n"
+    return section * max(1, int(megabytes * 1024 * 1024 / len(section.encode('utf-8'))))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--megabytes', type=float, default=20, help="approximate size of the decoded body")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    converter = EMLToPDFConverter()
+    data = itinerary_email(large_body(args.megabytes))
+    msg = converter.parse_bytes(data)
+    print(f"quoted-printable email: {len(data) / 1024 / 1024:.1f} MB")
+
+    for name, extract in (
+        ("old triple decode", lambda: old_extract_text(msg)),
+        ("single pass", lambda: converter.extract_text_content(msg)),
+    ):
+        elapsed = best_time(extract, args.repeat)
+        print(f"{name:>18}: {elapsed * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Throughput of the --latest-only revision pass: full MIME parse against the text-only parse it uses.
+
+Generates itinerary emails for a number of bookings, every other one with
+an attachment, and times the pass that finds each booking's latest
+revision, with the full parse it started out with and with the text-only
+parse it uses now.
+
+    python -m benchmarks.revision_scan --emails 1000 --attachment-kb 300
+"""
+
+import argparse
+import os
+import tempfile
+from contextlib import nullcontext
+from email.message import EmailMessage
+from pathlib import Path
+from unittest import mock
+
+from src.eml_to_pdf.converter import EMLToPDFConverter
+
+from .common import best_time, itinerary_body
+
+
+def write_emails(directory: Path, count: int, attachment_kb: int) -> list[Path]:
+    paths = []
+    for index in range(count):
+        msg = EmailMessage()
+        msg['Subject'] = "DOE/JOHN MR 27AUG2025 KEF HND"
+        msg['Date'] = f"Sat, 12 Jul 2025 10:{index % 60:02d}:00 +0000"
+        # 50 bookings, so most emails are superseded revisions
+        msg.set_content(itinerary_body().replace('ABC123', f"AB{index % 50:04d}"), cte='quoted-printable')
+        if index % 2 and attachment_kb:
+            msg.add_attachment(os.urandom(attachment_kb * 1024), maintype='application', subtype='pdf', filename='scan.pdf')
+        path = directory / f"{index:05d}.eml"
+        path.write_bytes(msg.as_bytes())
+        paths.append(path)
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--emails', type=int, default=1000)
+    parser.add_argument('--attachment-kb', type=int, default=300, help="attachment size of every other email (0 for none)")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    converter = EMLToPDFConverter(latest_only=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        tasks = [(path, Path(tmp) / f"{path.stem}.pdf") for path in write_emails(Path(tmp), args.emails, args.attachment_kb)]
+        full_parse = mock.patch.object(EMLToPDFConverter, '_parse_text_parts', staticmethod(converter.parse_source))
+        for name, patch in (("full MIME parse", full_parse), ("text-only parse", nullcontext())):
+            with patch:
+                elapsed = best_time(lambda: converter._scan_revisions(tasks), args.repeat)
+            print(f"{name:>16}: {args.emails / elapsed:8.0f} emails per second")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Per-document cost of the stylesheet: parsed once and shared, or embedded in every document.
+
+The per-document path is how PDFs were rendered before the stylesheet was
+shared: the CSS sits in a ``<style>`` tag of each HTML document, so
+WeasyPrint parses it and resolves fonts for every PDF. Needs WeasyPrint.
+
+    python -m benchmarks.stylesheet --documents 50
+"""
+
+import argparse
+import time
+
+from src.eml_to_pdf.converter import EMLToPDFConverter
+
+from .common import itinerary_email
+
+
+def render_per_document(converter: EMLToPDFConverter, documents: list[str]) -> None:
+    import weasyprint
+    for html_content in documents:
+        html_content = html_content.replace('<head>', f'<head><style>{converter.css_style}</style>', 1)
+        weasyprint.HTML(string=html_content, base_url='.', url_fetcher=converter.assets).write_pdf(
+            presentational_hints=True,
+        )
+
+
+def render_shared(converter: EMLToPDFConverter, documents: list[str]) -> None:
+    for html_content in documents:
+        converter.render_pdf(html_content)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--documents', type=int, default=50, help="documents rendered per variant")
+    args = parser.parse_args()
+
+    converter = EMLToPDFConverter(offline=True)
+    html_content = converter.convert_to_html(converter.parse_bytes(itinerary_email()))
+    documents = [html_content] * args.documents
+    # Imports, the first font lookup and the shared stylesheet are paid before timing
+    converter.warm_up()
+
+    for name, render in (("per-document stylesheet", render_per_document), ("shared stylesheet", render_shared)):
+        started = time.perf_counter()
+        render(converter, documents)
+        elapsed = time.perf_counter() - started
+        print(f"{name:>24}: {elapsed:7.2f} s, {elapsed / args.documents * 1000:7.1f} ms per document")
+
+
+if __name__ == '__main__':
+    main()
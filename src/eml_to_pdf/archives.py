@@ -0,0 +1,189 @@
+"""EML files read straight out of gzip files and zip or tar archives."""
+
+import email.message
+import gzip
+import os
+import tarfile
+import zipfile
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.parser import BytesHeaderParser
+from pathlib import Path, PurePosixPath
+from typing import Iterator
+
+from .prescan import MAX_HEADER_BYTES
+
+EML_SUFFIXES = ('.eml', '.eml.gz')
+# Archives whose members can be read independently by each worker
+INDEXED_ARCHIVE_SUFFIXES = ('.zip', '.tar')
+# Compressed tar streams can only be read front to back
+TAR_STREAM_SUFFIXES = ('.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+# Zip archives kept open per process, so reading a member does not re-parse the central directory
+MAX_OPEN_ZIPS = 8
+
+# Per path: the open archive and the (inode, size, mtime) it was opened at
+_open_zips: "OrderedDict[Path, tuple[zipfile.ZipFile, tuple[int, int, int]]]" = OrderedDict()
+_open_zips_pid = os.getpid()
+
+
+def is_eml_name(name: str) -> bool:
+    return name.lower().endswith(EML_SUFFIXES)
+
+
+def is_indexed_archive(path: Path) -> bool:
+    return path.name.lower().endswith(INDEXED_ARCHIVE_SUFFIXES)
+
+
+def is_tar_stream(path: Path) -> bool:
+    return path.name.lower().endswith(TAR_STREAM_SUFFIXES)
+
+
+def strip_suffixes(name: str) -> str:
+    """Strip the EML or archive extension from a file name."""
+    lower = name.lower()
+    for suffix in EML_SUFFIXES + INDEXED_ARCHIVE_SUFFIXES + TAR_STREAM_SUFFIXES:
+        if lower.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+def safe_path(name: str) -> Path:
+    """Relative path for an untrusted name, e.g. an archive member.
+
+    Absolute paths and ".." components are dropped to keep every file
+    inside the output directory.
+    """
+    parts = [part for part in PurePosixPath(name.replace('\\', '/')).parts if part not in ('/', '..', '.')]
+    return Path(*parts) if parts else Path('message')
+
+
+def pdf_path(name: str) -> Path:
+    """Relative PDF path for an EML file or archive member called ``name``."""
+    path = safe_path(name)
+    return path.with_name(strip_suffixes(path.name) + '.pdf')
+
+
+def read_gzip(path: Path) -> bytes:
+    with gzip.open(path, 'rb') as f:
+        return f.read()
+
+
+def _maybe_gunzip(name: str, data: bytes) -> bytes:
+    return gzip.decompress(data) if name.lower().endswith('.gz') else data
+
+
+def _open_zip(path: Path) -> zipfile.ZipFile:
+    """The open ``ZipFile`` for ``path`` in this process, opening it on first use.
+
+    Reopened when the file was replaced or rewritten since, so a long-lived
+    process never reads members from a stale central directory.
+    """
+    global _open_zips_pid
+    if _open_zips_pid != os.getpid():
+        # Inherited through fork: the file offsets are shared with the parent
+        _open_zips.clear()
+        _open_zips_pid = os.getpid()
+    stat = os.stat(path)
+    identity = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    cached = _open_zips.get(path)
+    if cached is not None and cached[1] == identity:
+        _open_zips.move_to_end(path)
+        return cached[0]
+    if cached is not None:
+        cached[0].close()
+    archive = zipfile.ZipFile(path)
+    _open_zips[path] = (archive, identity)
+    _open_zips.move_to_end(path)
+    if len(_open_zips) > MAX_OPEN_ZIPS:
+        _open_zips.popitem(last=False)[1][0].close()
+    return archive
+
+
+def _parse_header_bytes(data: bytes) -> email.message.Message:
+    data = data[:MAX_HEADER_BYTES]
+    header_end = data.find(b'\n\n')
+    if header_end >= 0:
+        data = data[:header_end + 1]
+    return BytesHeaderParser().parsebytes(data)
+
+
+@dataclass(frozen=True)
+class ArchiveMember:
+    """An EML file inside a zip or uncompressed tar archive.
+
+    Tar members are located by byte range and zip members by name, so each
+    worker reads and decompresses just the members it converts.
+    """
+    archive: Path
+    member: str
+    start: int = 0
+    size: int = 0
+
+    @property
+    def name(self) -> str:
+        return PurePosixPath(self.member).name
+
+    def __str__(self) -> str:
+        return f"{self.archive}!{self.member}"
+
+    def key(self) -> str:
+        return f"{self.archive.resolve()}!{self.member}"
+
+    def read_bytes(self) -> bytes:
+        """Read the member, decompressing it if it is an ``.eml.gz``."""
+        if self.archive.name.lower().endswith('.zip'):
+            data = _open_zip(self.archive).read(self.member)
+        else:
+            with open(self.archive, 'rb') as f:
+                f.seek(self.start)
+                data = f.read(self.size)
+        return _maybe_gunzip(self.member, data)
+
+    def read_headers(self) -> email.message.Message:
+        return _parse_header_bytes(self.read_bytes())
+
+
+@dataclass(frozen=True)
+class InlineMessage:
+    """An EML file already read into memory, e.g. from a tar stream."""
+    origin: str
+    member: str
+    data: bytes
+
+    @property
+    def name(self) -> str:
+        return PurePosixPath(self.member).name
+
+    def __str__(self) -> str:
+        return f"{self.origin}!{self.member}"
+
+    def key(self) -> str:
+        return str(self)
+
+    def read_bytes(self) -> bytes:
+        return _maybe_gunzip(self.member, self.data)
+
+    def read_headers(self) -> email.message.Message:
+        return _parse_header_bytes(self.read_bytes())
+
+
+def iter_archive(path: Path) -> Iterator[ArchiveMember]:
+    """Yield the EML members of a zip or uncompressed tar archive, reading only its index."""
+    if path.name.lower().endswith('.zip'):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and is_eml_name(info.filename):
+                    yield ArchiveMember(path, info.filename)
+    else:
+        with tarfile.open(path, 'r:') as archive:
+            for info in archive:
+                if info.isfile() and is_eml_name(info.name):
+                    yield ArchiveMember(path, info.name, info.offset_data, info.size)
+
+
+def iter_tar_stream(fileobj, origin: str) -> Iterator[InlineMessage]:
+    """Yield the EML members of a (possibly compressed) tar stream, front to back."""
+    with tarfile.open(fileobj=fileobj, mode='r|*') as archive:
+        for info in archive:
+            if info.isfile() and is_eml_name(info.name):
+                yield InlineMessage(origin, info.name, archive.extractfile(info).read())
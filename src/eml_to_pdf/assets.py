@@ -0,0 +1,129 @@
+"""Cached, offline-capable fetching of remote resources referenced by the PDFs."""
+
+import base64
+import hashlib
+import json
+import mimetypes
+import os
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+from rich.console import Console
+
+console = Console()
+
+LOGO_URL = "https://www.triptojapan.com/logo.svg"
+
+
+def default_cache_dir() -> Path:
+    """Return the per-user directory used to persist fetched assets."""
+    base = os.environ.get('XDG_CACHE_HOME') or Path.home() / ".cache"
+    return Path(base) / "eml-to-pdf" / "assets"
+
+
+class AssetCache:
+    """WeasyPrint ``url_fetcher`` backed by an in-memory and on-disk asset cache.
+
+    Every remote URL is fetched at most once per cache directory; later lookups
+    are served from memory within a process and from disk across processes and
+    runs. Failed fetches are remembered for the lifetime of the process, so an
+    unreachable host costs a single timeout instead of one per document.
+    In offline mode the network is never touched and uncached URLs fail fast.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, offline: bool = False, timeout: int = 10):
+        self.cache_dir = cache_dir if cache_dir is not None else default_cache_dir()
+        self.offline = offline
+        self.timeout = timeout
+        self._memory: Dict[str, Dict[str, Any]] = {}
+        self._failures: Dict[str, str] = {}
+        self._data_uris: Dict[str, str] = {}
+
+    def __call__(self, url: str) -> Dict[str, Any]:
+        return self.fetch(url)
+
+    def fetch(self, url: str) -> Dict[str, Any]:
+        """Fetch ``url`` using the cache, in the format WeasyPrint expects."""
+        if not url.startswith(('http://', 'https://')):
+            # data: and file: URLs are already local, nothing to cache
+            import weasyprint
+            return weasyprint.default_url_fetcher(url, timeout=self.timeout)
+
+        if url in self._memory:
+            return dict(self._memory[url])
+        if url in self._failures:
+            raise OSError(self._failures[url])
+
+        resource = self._read_disk(url)
+        if resource is None:
+            if self.offline:
+                raise OSError(f"Asset not cached and offline mode is enabled: {url}")
+            try:
+                resource = self._download(url)
+            except Exception as e:
+                self._failures[url] = f"Failed to fetch {url}: {e}"
+                raise
+            self._write_disk(url, resource)
+
+        self._memory[url] = resource
+        return dict(resource)
+
+    def data_uri(self, url: str) -> str:
+        """Resolve ``url`` once and return it inlined as a ``data:`` URI."""
+        if url not in self._data_uris:
+            resource = self.fetch(url)
+            if 'string' in resource:
+                data = resource['string']
+            else:
+                with resource['file_obj'] as file_obj:
+                    data = file_obj.read()
+            mime_type = resource.get('mime_type') or mimetypes.guess_type(url)[0] or 'application/octet-stream'
+            encoded = base64.b64encode(data).decode('ascii')
+            self._data_uris[url] = f"data:{mime_type};base64,{encoded}"
+        return self._data_uris[url]
+
+    def _download(self, url: str) -> Dict[str, Any]:
+        """Fetch ``url`` from the network and load it fully into memory."""
+        import weasyprint
+        result = weasyprint.default_url_fetcher(url, timeout=self.timeout)
+        if 'string' in result:
+            data = result['string']
+        else:
+            with result['file_obj'] as file_obj:
+                data = file_obj.read()
+        if isinstance(data, str):
+            data = data.encode(result.get('encoding') or 'utf-8')
+
+        resource = {'string': data, 'redirected_url': result.get('redirected_url', url)}
+        for key in ('mime_type', 'encoding'):
+            if result.get(key):
+                resource[key] = result[key]
+        return resource
+
+    def _cache_paths(self, url: str) -> tuple[Path, Path]:
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return self.cache_dir / key, self.cache_dir / f"{key}.json"
+
+    def _read_disk(self, url: str) -> Optional[Dict[str, Any]]:
+        data_path, meta_path = self._cache_paths(url)
+        try:
+            meta = json.loads(meta_path.read_text())
+            data = data_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        return {**meta, 'string': data}
+
+    def _write_disk(self, url: str, resource: Dict[str, Any]) -> None:
+        data_path, meta_path = self._cache_paths(url)
+        meta = {key: value for key, value in resource.items() if key != 'string'}
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Write data before metadata and publish each atomically, so
+            # concurrent workers never read a half-written entry
+            for path, payload in ((data_path, resource['string']), (meta_path, json.dumps(meta).encode())):
+                tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+                tmp_path.write_bytes(payload)
+                os.replace(tmp_path, path)
+        except OSError as e:
+            # A read-only or full cache directory only costs us persistence
+            console.print(f"⚠️  Could not cache asset {url}: {e}")
@@ -1,22 +1,143 @@
 """Command-line interface for EML to PDF converter."""
 
+import os
+import re
+import sys
+import tempfile
+from contextlib import ExitStack
 from pathlib import Path
 from typing import Optional
 
 import click
 from rich.console import Console
 
-from .converter import EMLToPDFConverter
+from .converter import EMLToPDFConverter, MIME_MODES, PARSE_MODES
+from .archives import is_indexed_archive, is_tar_stream, pdf_path
+from .dedup import DEDUP_MODES
+from .maildir import is_maildir
+from .mbox import is_mbox
+from .records import RECORD_FORMATS, is_record_file, record_format
+from .sink import is_archive_output
 
 console = Console()
 
 
-@click.command()
-@click.argument('input_path', type=click.Path(exists=True, path_type=Path))
+def _validate_regex(ctx: click.Context, param: click.Parameter, value: Optional[str]) -> Optional[str]:
+    if value is not None:
+        try:
+            re.compile(value)
+        except re.error as e:
+            raise click.BadParameter(f"invalid regular expression: {e}")
+    return value
+
+
+# Options that shape the PDFs, shared by one-off conversions and the server
+_CONVERTER_OPTIONS = [
+    click.option(
+        '--logo',
+        help='URL or local file path of the header logo (defaults to the Trip to Japan logo URL).'
+    ),
+    click.option(
+        '--inline-logo',
+        is_flag=True,
+        default=False,
+        help='Embed the logo as a data URI, resolved once per process.'
+    ),
+    click.option(
+        '--asset-cache',
+        type=click.Path(file_okay=False, path_type=Path),
+        help='Directory for cached remote assets (defaults to ~/.cache/eml-to-pdf/assets).'
+    ),
+    click.option(
+        '--offline',
+        is_flag=True,
+        default=False,
+        help='Never fetch assets over the network; use only cached or local assets.'
+    ),
+    click.option(
+        '--parse-mode',
+        type=click.Choice(PARSE_MODES),
+        default='regex',
+        show_default=True,
+        help='Flight section parser; "linear" guarantees linear time on adversarial bodies.'
+    ),
+    click.option(
+        '--parse-timeout',
+        type=click.FloatRange(min=0, min_open=True),
+        help='Per-email parsing budget in seconds; slower emails are reported as timed out.'
+    ),
+    click.option(
+        '--mime-mode',
+        type=click.Choice(MIME_MODES),
+        default='full',
+        show_default=True,
+        help='MIME parser; "streaming" skips attachments without loading them into memory.'
+    ),
+    click.option(
+        '--render-cache',
+        type=click.Path(file_okay=False, path_type=Path),
+        help='Reuse PDFs rendered before from identical HTML, kept in this directory.'
+    ),
+    click.option(
+        '--render-cache-size',
+        type=click.IntRange(min=1),
+        default=1024,
+        show_default=True,
+        help='Size limit of the render cache in MB; least recently used PDFs are evicted.'
+    ),
+]
+
+
+def _converter_options(command):
+    for option in reversed(_CONVERTER_OPTIONS):
+        command = option(command)
+    return command
+
+
+def _consoles() -> list[Console]:
+    """The console of every module that reports progress, so it can be redirected."""
+    from . import assets, converter
+    return [console, converter.console, assets.console]
+
+
+class _DefaultGroup(click.Group):
+    """Runs ``convert`` unless the first argument names another command.
+    
+    Keeps ``eml-to-pdf email.eml`` working alongside ``eml-to-pdf serve``.
+    A leading ``--help`` stays with the group, so it lists the subcommands.
+    """
+    
+    def parse_args(self, ctx: click.Context, args: list[str]) -> list[str]:
+        if not args or (args[0] not in self.commands and args[0] not in self.get_help_option_names(ctx)):
+            args = ['convert', *args]
+        return super().parse_args(ctx, args)
+
+
+@click.group(cls=_DefaultGroup)
+def main():
+    """Convert Amadeus booking emails to PDF.
+    
+    Without a command, arguments go to convert: "eml-to-pdf email.eml" is
+    short for "eml-to-pdf convert email.eml". Run "eml-to-pdf COMMAND --help"
+    for the options of each command.
+    """
+
+
+@main.command('convert')
+@click.argument('input_path', type=click.Path(exists=True, allow_dash=True, path_type=Path))
 @click.option(
     '--output', '-o',
     type=click.Path(path_type=Path),
-    help='Output file or directory. If not specified, creates PDF next to EML file.'
+    help='Output file or directory. If not specified, creates PDF next to EML file. '
+         'In batch mode, a .zip or .tar[.gz|.xz] path collects every PDF into that archive, '
+         'and a .jsonl path receives extracted booking records instead of PDFs.'
+)
+@click.option(
+    '--format', 'output_format',
+    type=click.Choice(('pdf',) + RECORD_FORMATS),
+    help='Output format. jsonl and csv extract the booking and flights of each email without '
+         'rendering PDFs, to --output or, without it, to stdout. Defaults to pdf, or to the '
+         'record format named by a .jsonl/.csv --output in batch mode.'
 )
 @click.option(
     '--batch/--single', 
@@ -29,10 +150,103 @@ console = Console()
     default=False,
     help='Recursively process EML files in subdirectories (requires --batch).'
 )
-def main(input_path: Path, output: Optional[Path], batch: bool, recursive: bool):
+@click.option(
+    '--jobs', '-j',
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help='Number of worker processes for batch mode (0 uses all CPU cores).'
+)
+@_converter_options
+@click.option(
+    '--incremental',
+    is_flag=True,
+    default=False,
+    help=(
+        'Only convert new or changed EML files, tracked by a manifest in the output directory (batch mode). '
+        'Covers zip and uncompressed tar members; members of compressed tar files are always converted.'
+    )
+)
+@click.option(
+    '--resume',
+    is_flag=True,
+    default=False,
+    help='Continue an interrupted batch, skipping files its journal already recorded (batch mode).'
+)
+@click.option(
+    '--fsync-every',
+    type=click.IntRange(min=0),
+    default=0,
+    show_default=True,
+    help='Durability of written PDFs: 0 never fsyncs, 1 fsyncs each PDF, N fsyncs them in groups of N.'
+)
+@click.option(
+    '--timeout',
+    type=click.FloatRange(min=0, min_open=True),
+    help='Batch only: kill and quarantine any file that takes longer than this many seconds'
+)
+@click.option(
+    '--max-memory',
+    type=click.IntRange(min=1),
+    help='Batch only: memory limit in MB for each worker process'
+)
+@click.option(
+    '--max-tasks-per-worker',
+    type=click.IntRange(min=1),
+    help='Batch only: restart each worker process after this many files'
+)
+@click.option(
+    '--subject-filter',
+    metavar='REGEX',
+    callback=_validate_regex,
+    help='Batch only: convert only emails whose Subject matches this regular expression (case-insensitive)'
+)
+@click.option(
+    '--dedup',
+    type=click.Choice(DEDUP_MODES),
+    help='Batch only: render one copy of each email (by Message-ID or body hash) and '
+         'list the others in duplicates.jsonl, or also symlink them to its PDF'
+)
+@click.option(
+    '--latest-only',
+    is_flag=True,
+    default=False,
+    help='Batch only: render only the newest email of each booking reference and passenger'
+)
+def convert(
+    input_path: Path,
+    output: Optional[Path],
+    output_format: Optional[str],
+    batch: bool,
+    recursive: bool,
+    jobs: int,
+    logo: Optional[str],
+    inline_logo: bool,
+    asset_cache: Optional[Path],
+    offline: bool,
+    parse_mode: str,
+    parse_timeout: Optional[float],
+    incremental: bool,
+    resume: bool,
+    fsync_every: int,
+    timeout: Optional[float],
+    max_memory: Optional[int],
+    max_tasks_per_worker: Optional[int],
+    subject_filter: Optional[str],
+    dedup: Optional[str],
+    latest_only: bool,
+    mime_mode: str,
+    render_cache: Optional[Path],
+    render_cache_size: int,
+):
     """Convert EML files to PDF format.
     
-    INPUT_PATH can be either a single EML file or a directory containing EML files.
+    INPUT_PATH can be a single EML file, a directory containing EML files, an
+    mbox file, a Maildir, a zip or tar archive of EML files, "-" to read a
+    tar stream from stdin, or a .jsonl file of bookings extracted earlier.
+    Gzipped EML files (.eml.gz) and archives inside directories are converted
+    without extracting them. In batch mode, an --output ending in .jsonl
+    extracts each email's booking into that file instead of rendering PDFs.
     
     Examples:
         eml-to-pdf email.eml                    # Convert single file
@@ -41,51 +255,319 @@ def main(input_path: Path, output: Optional[Path], batch: bool, recursive: bool)
         eml-to-pdf ./emails/ --batch -r        # Convert all EML files recursively
         eml-to-pdf ./emails/ --batch -o ./pdfs/  # Convert all with custom output directory
         eml-to-pdf ./emails/ --batch -r -o ./pdfs/  # Convert recursively with output directory
+        eml-to-pdf ./emails/ --batch -r -j 8   # Convert recursively with 8 worker processes
+        eml-to-pdf ./emails/ --batch --logo logo.svg --inline-logo  # Use a bundled logo
+        eml-to-pdf ./emails/ --batch -r --incremental  # Only convert new or changed files
+        eml-to-pdf ./emails/ --batch -r --resume       # Continue an interrupted batch
+        eml-to-pdf ./emails/ --batch -r --timeout 60   # Quarantine files that hang
+        eml-to-pdf ./emails/ --batch -r --render-cache ~/.cache/eml-to-pdf/renders  # Render duplicates once
+        eml-to-pdf ./emails/ --batch --subject-filter 'TYO'  # Only bookings to Tokyo
+        eml-to-pdf ./emails/ --batch -r --dedup symlink  # Render each email once, link its copies
+        eml-to-pdf ./emails/ --batch -r --latest-only  # Render only the current state of each booking
+        eml-to-pdf archive.mbox --batch -o ./pdfs/ -j 8  # Convert every message of an mbox
+        eml-to-pdf ~/Maildir --batch -o ./pdfs/  # Convert mail that arrived since the last run
+        eml-to-pdf backup.tar.gz --batch -o ./pdfs/  # Convert the EML files in an archive
+        tar -c emails | eml-to-pdf - --batch -o ./pdfs/  # Convert a tar stream from stdin
+        eml-to-pdf ./emails/ --batch -r -o pdfs.zip  # Write all PDFs into one zip archive
+        eml-to-pdf ./emails/ --batch -r -o bookings.jsonl  # Extract bookings without rendering
+        eml-to-pdf bookings.jsonl --batch -o ./pdfs/  # Render PDFs from extracted bookings
+        eml-to-pdf serve -j 4                    # Run a conversion server (see serve --help)
     """
-    converter = EMLToPDFConverter()
+    if output_format is None:
+        output_format = (record_format(output) if output is not None and batch else None) or 'pdf'
+    extracting = output_format in RECORD_FORMATS
+    to_stdout = extracting and (output is None or str(output) == '-')
+    if to_stdout:
+        # stdout carries the records; progress goes to stderr
+        for module_console in _consoles():
+            module_console.file = sys.stderr
     
-    try:
-        # Validate recursive option
-        if recursive and not batch:
-            console.print("❌ --recursive flag requires --batch mode")
+    if latest_only and str(input_path) == '-':
+        # Revisions are compared across the whole batch, which a stream never is
+        console.print("❌ --latest-only needs the whole input up front and cannot read stdin")
+        raise click.Abort()
+    
+    sink_output = None
+    if extracting or (output is not None and batch and is_archive_output(output)):
+        # Stream every PDF into one archive, or every extracted booking into one
+        # record file or stdout, instead of loose files
+        if incremental or resume:
+            console.print("❌ --incremental and --resume need an output directory")
+            raise click.Abort()
+        if dedup:
+            console.print("❌ --dedup needs an output directory to keep its seen set in")
+            raise click.Abort()
+        if input_path.is_dir() and is_maildir(input_path):
+            console.print("❌ Maildir input needs an output directory to keep its cursor in")
             raise click.Abort()
+        sink_output = output
+    
+    converter = EMLToPDFConverter(
+        logo=logo,
+        inline_logo=inline_logo,
+        asset_cache_dir=asset_cache,
+        offline=offline,
+        parse_mode=parse_mode,
+        parse_timeout=parse_timeout,
+        fsync_every=fsync_every,
+        task_timeout=timeout,
+        max_memory=max_memory * 1024 * 1024 if max_memory else None,
+        max_tasks_per_worker=max_tasks_per_worker,
+        subject_filter=subject_filter,
+        dedup=dedup,
+        latest_only=latest_only,
+        mime_mode=mime_mode,
+        render_cache_dir=render_cache,
+        render_cache_size=render_cache_size * 1024 * 1024,
+    )
+    
+    try:
+        with ExitStack() as stack:
+            if sink_output is not None or extracting:
+                # Batch state (journal, mirror directories) goes to a scratch
+                # directory; the results and failures go into the archive or record file
+                output = Path(stack.enter_context(tempfile.TemporaryDirectory(prefix="eml-to-pdf-")))
+                if extracting:
+                    target = click.get_text_stream('stdout') if to_stdout else sink_output
+                    records = stack.enter_context(converter.output_records(target, output_format))
+                else:
+                    stack.enter_context(converter.output_archive(sink_output))
             
-        if input_path.is_file() and input_path.suffix.lower() == '.eml':
-            # Single file conversion
-            if batch:
-                console.print("❌ Cannot use --batch with single file input")
-                raise click.Abort()
-            if recursive:
-                console.print("❌ Cannot use --recursive with single file input")
+            # Validate recursive option
+            if recursive and not batch:
+                console.print("❌ --recursive flag requires --batch mode")
                 raise click.Abort()
             
-            result = converter.convert_eml_to_pdf(input_path, output)
-            console.print(f"📄 PDF created: [bold green]{result}[/bold green]")
+            if str(input_path) == '-' or (input_path.is_file() and (is_indexed_archive(input_path) or is_tar_stream(input_path))):
+                # Archive conversion, straight from the archive or a stdin tar stream
+                if not batch:
+                    console.print("💡 Use --batch flag to convert all EML files in an archive")
+                    raise click.Abort()
+                if recursive:
+                    console.print("❌ Cannot use --recursive with archive input")
+                    raise click.Abort()
+                if incremental and (str(input_path) == '-' or is_tar_stream(input_path)):
+                    console.print("❌ --incremental is not supported for compressed tar input, use --resume")
+                    raise click.Abort()
             
-        elif input_path.is_dir():
-            # Directory conversion
-            if not batch:
-                console.print("💡 Use --batch flag to convert all EML files in directory")
-                raise click.Abort()
+                if str(input_path) == '-':
+                    results = converter.tar_stream_convert(
+                        click.get_binary_stream('stdin'), output or Path("converted_pdfs"), jobs=jobs, resume=resume
+                    )
+                else:
+                    results = converter.archive_convert(input_path, output, jobs=jobs, resume=resume, incremental=incremental)
+                if results:
+                    console.print(f"📁 Converted {len(results)} files to: [bold green]{output or results[0].parent}[/bold green]")
+                else:
+                    console.print("❌ No files were converted")
             
-            if recursive:
-                results = converter.recursive_batch_convert(input_path, output)
-            else:
-                results = converter.batch_convert(input_path, output)
+            elif input_path.is_file() and is_record_file(input_path):
+                # Render booking records extracted by an earlier run
+                if not batch:
+                    console.print("💡 Use --batch flag to render the records in a record file")
+                    raise click.Abort()
+                if recursive:
+                    console.print("❌ Cannot use --recursive with record file input")
+                    raise click.Abort()
+                if incremental:
+                    console.print("❌ --incremental is not supported for record file input, use --resume")
+                    raise click.Abort()
+                if extracting:
+                    console.print("❌ Record file input is already extracted, render it to a directory or archive")
+                    raise click.Abort()
+            
+                results = converter.records_convert(input_path, output, jobs=jobs, resume=resume)
+                if results:
+                    console.print(f"📁 Rendered {len(results)} records to: [bold green]{results[0].parent}[/bold green]")
+                else:
+                    console.print("❌ No records were rendered")
+            
+            elif input_path.is_file() and input_path.name.lower().endswith(('.eml', '.eml.gz')):
+                # Single file conversion
+                if batch:
+                    console.print("❌ Cannot use --batch with single file input")
+                    raise click.Abort()
+                if recursive:
+                    console.print("❌ Cannot use --recursive with single file input")
+                    raise click.Abort()
+            
+                if extracting:
+                    name = pdf_path(input_path.name).name
+                    records.add(name, converter.extract_record(input_path, name))
+                else:
+                    result = converter.convert_eml_to_pdf(input_path, output)
+                    console.print(f"📄 PDF created: [bold green]{result}[/bold green]")
+            
+            elif input_path.is_dir() and is_maildir(input_path):
+                # Maildir conversion, only messages new since the last run
+                if not batch:
+                    console.print("💡 Use --batch flag to convert the messages in a Maildir")
+                    raise click.Abort()
+                if recursive:
+                    console.print("❌ Cannot use --recursive with Maildir input")
+                    raise click.Abort()
+                if incremental:
+                    console.print("❌ Maildir input is always incremental, drop --incremental")
+                    raise click.Abort()
+            
+                results = converter.maildir_convert(input_path, output, jobs=jobs, resume=resume)
+                if results:
+                    console.print(f"📁 Converted {len(results)} messages to: [bold green]{results[0].parent}[/bold green]")
+            
+            elif input_path.is_dir():
+                # Directory conversion
+                if not batch:
+                    console.print("💡 Use --batch flag to convert all EML files in directory")
+                    raise click.Abort()
+            
+                if recursive:
+                    results = converter.recursive_batch_convert(
+                        input_path, output, jobs=jobs, incremental=incremental, resume=resume
+                    )
+                else:
+                    results = converter.batch_convert(
+                        input_path, output, jobs=jobs, incremental=incremental, resume=resume
+                    )
                 
-            if results:
-                console.print(f"📁 Converted {len(results)} files to: [bold green]{results[0].parent}[/bold green]")
-            else:
-                console.print("❌ No files were converted")
+                if results:
+                    console.print(f"📁 Converted {len(results)} files to: [bold green]{results[0].parent}[/bold green]")
+                else:
+                    console.print("❌ No files were converted")
                 
-        else:
-            console.print("❌ Input must be an EML file or directory containing EML files")
-            raise click.Abort()
+            elif input_path.is_file() and is_mbox(input_path):
+                # mbox archive conversion
+                if not batch:
+                    console.print("💡 Use --batch flag to convert all messages in an mbox file")
+                    raise click.Abort()
+                if recursive:
+                    console.print("❌ Cannot use --recursive with mbox input")
+                    raise click.Abort()
+                if incremental:
+                    console.print("❌ --incremental is not supported for mbox input, use --resume")
+                    raise click.Abort()
+            
+                results = converter.mbox_convert(input_path, output, jobs=jobs, resume=resume)
+                if results:
+                    console.print(f"📁 Converted {len(results)} messages to: [bold green]{results[0].parent}[/bold green]")
+                else:
+                    console.print("❌ No messages were converted")
+                
+            else:
+                console.print("❌ Input must be an EML file, a directory containing EML files, or an mbox file")
+                raise click.Abort()
+            
+        if extracting and not to_stdout:
+            console.print(f"🧾 Booking records written to: [bold green]{sink_output}[/bold green]")
+        elif sink_output is not None and not extracting:
+            console.print(f"📦 PDFs written to archive: [bold green]{sink_output}[/bold green]")
             
     except Exception as e:
         console.print(f"❌ Error: {e}")
         raise click.Abort()
 
 
+
+@main.command('serve')
+@click.option('--host', default='127.0.0.1', show_default=True, help='Address to listen on.')
+@click.option('--port', '-p', type=click.IntRange(0, 65535), default=8000, show_default=True, help='TCP port to listen on.')
+@click.option(
+    '--socket', 'socket_path',
+    type=click.Path(dir_okay=False, path_type=Path),
+    help='Listen on this unix socket instead of a TCP port.'
+)
+@click.option(
+    '--jobs', '-j',
+    type=click.IntRange(min=0),
+    default=0,
+    show_default=True,
+    help='Number of pre-warmed worker processes (0 uses all CPU cores).'
+)
+@click.option(
+    '--queue-size',
+    type=click.IntRange(min=0),
+    default=16,
+    show_default=True,
+    help='Requests that may wait for a busy worker; further requests get 503 Retry-After.'
+)
+@click.option(
+    '--timeout',
+    type=click.FloatRange(min=0, min_open=True),
+    help='Kill the worker and answer 504 when an email takes longer than this many seconds.'
+)
+@click.option(
+    '--max-memory',
+    type=click.IntRange(min=1),
+    help='Memory limit in MB for each worker process.'
+)
+@click.option(
+    '--max-tasks-per-worker',
+    type=click.IntRange(min=1),
+    help='Restart each worker process after this many emails.'
+)
+@_converter_options
+def serve(
+    host: str,
+    port: int,
+    socket_path: Optional[Path],
+    jobs: int,
+    queue_size: int,
+    timeout: Optional[float],
+    max_memory: Optional[int],
+    max_tasks_per_worker: Optional[int],
+    logo: Optional[str],
+    inline_logo: bool,
+    asset_cache: Optional[Path],
+    offline: bool,
+    parse_mode: str,
+    parse_timeout: Optional[float],
+    mime_mode: str,
+    render_cache: Optional[Path],
+    render_cache_size: int,
+):
+    """Run a conversion server backed by pre-warmed worker processes.
+    
+    Each worker loads WeasyPrint, fonts and the stylesheet once at start-up,
+    so a request pays only for parsing and rendering its email.
+    
+    \b
+    Endpoints:
+        POST /convert   EML in the request body, PDF in the response
+        GET  /health    Worker counts as JSON (503 until a worker is warm)
+        GET  /metrics   Request counters and gauges in Prometheus text format
+    
+    \b
+    Examples:
+        eml-to-pdf serve -j 4 --port 8080
+        eml-to-pdf serve --socket /run/eml-to-pdf.sock --timeout 30
+        curl --data-binary @email.eml localhost:8000/convert -o email.pdf
+    """
+    from .server import WarmPool, serve as run_server
+    
+    converter = EMLToPDFConverter(
+        logo=logo,
+        inline_logo=inline_logo,
+        asset_cache_dir=asset_cache,
+        offline=offline,
+        parse_mode=parse_mode,
+        parse_timeout=parse_timeout,
+        mime_mode=mime_mode,
+        render_cache_dir=render_cache,
+        render_cache_size=render_cache_size * 1024 * 1024,
+    )
+    pool = WarmPool(
+        jobs or os.cpu_count() or 1,
+        converter._worker_kwargs(),
+        queue_size=queue_size,
+        task_timeout=timeout,
+        memory_limit=max_memory * 1024 * 1024 if max_memory else None,
+        max_tasks_per_child=max_tasks_per_worker,
+    )
+    try:
+        run_server(pool, host=host, port=port, socket_path=socket_path)
+    except (OSError, RuntimeError) as e:
+        console.print(f"❌ Error: {e}")
+        raise click.Abort()
+
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -1,61 +1,492 @@
 """Core EML to PDF conversion functionality."""
 
 import email
+import email.message
+import hashlib
 import html
+import io
+import os
 import re
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
+import signal
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from itertools import chain
 from pathlib import Path
-from typing import Optional, Dict, List, Any
-from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional, Dict, List, Any, BinaryIO, Callable, Iterable, Iterator, TextIO, Union
 from datetime import datetime
 
-import weasyprint
 from rich.console import Console
 
+from .archives import (
+    ArchiveMember, InlineMessage, is_indexed_archive, is_tar_stream,
+    iter_archive, iter_tar_stream, pdf_path, read_gzip, safe_path, strip_suffixes,
+)
+from .assets import AssetCache, LOGO_URL
+from .dedup import DEDUP_MODES, DUPLICATES_NAME, SeenSet, message_key, write_duplicates
+from .journal import Journal, JOURNAL_NAME, QUARANTINE_NAME, write_quarantine
+from .maildir import MaildirCursor, list_maildir, output_name
+from .manifest import Manifest
+from .mapped import mapped_file, mapped_range, message_from_buffer, open_range
+from .mbox import MboxMessage, iter_mbox
+from .models import BookingInfo, FlightInfo
+from .prescan import read_headers, header_text
+from .render_cache import DEFAULT_MAX_BYTES as DEFAULT_RENDER_CACHE_BYTES, RenderCache
+from .records import RecordEntry, RecordLine, RecordSink, booking_from_record, booking_record, iter_record_lines
+from .revisions import SUPERSEDED_NAME, RevisionIndex, RevisionScan, message_time, revision_key, write_superseded
+from .sink import ArchiveEntry, ArchiveSink
+from .streaming import read_text_message, parse_text_message
+
+if TYPE_CHECKING:
+    # WeasyPrint pulls in Pango, cairo and fontconfig, which takes hundreds of
+    # milliseconds; it is imported on first render so the CLI starts fast
+    import weasyprint
+    from weasyprint.text.fonts import FontConfiguration
+
 console = Console()
 
+# Bump when parsing output changes, or when the HTML templates below change,
+# so incremental batches re-render everything affected
+PARSER_VERSION = "2"
+TEMPLATE_VERSION = "1"
+
+# Temp PDFs of _atomic_output: ".<name>.pdf.<pid>.tmp"
+_TEMP_PDF_RE = re.compile(r'^\..+\.pdf\.(\d+)\.tmp$')
+
+
+class ParseTimeout(Exception):
+    """Raised when parsing a single email exceeds its time budget."""
+
+
+@contextmanager
+def _time_budget(seconds: Optional[float]) -> Iterator[Optional[float]]:
+    """Bound the enclosed parsing work to ``seconds`` of wall-clock time.
+    
+    Yields the monotonic deadline for cooperative checks. On POSIX main
+    threads an interval timer also interrupts a runaway regex, since the
+    ``re`` engine periodically checks for pending signals.
+    """
+    if not seconds:
+        yield None
+        return
+    
+    deadline = time.monotonic() + seconds
+    if not hasattr(signal, 'setitimer') or threading.current_thread() is not threading.main_thread():
+        yield deadline
+        return
+    
+    def on_alarm(signum, frame):
+        raise ParseTimeout(f"Parsing exceeded the {seconds:g}s time budget")
+    
+    previous_handler = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield deadline
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+
+
+# Amadeus flight parsing patterns, compiled once at import time.
+#
+# Advanced multi-line flight section extraction including detail sections.
+# This pattern captures flight header + its detail section (booking ref, baggage, meal, aircraft)
+_FLIGHT_SECTION_RE = re.compile(
+    r'FLIGHT\s+([A-Z0-9\s\-]+\s*-\s*[A-Z\s]+).*?(?=FLIGHT\s+[A-Z0-9\s\-]+\s*-\s*[A-Z\s]+|FLIGHT\(S\)\s+CALCULATED|GENERAL\s+INFORMATION|FLIGHT\s+TICKET|$)',
+    re.DOTALL | re.IGNORECASE
+)
+
+# Building blocks for the linear-time section splitter. Each one is a single
+# character class or literal without nested quantifiers, so matching never
+# backtracks more than the length of the run it consumes.
+_FLIGHT_WORD_RE = re.compile(r'FLIGHT(?=\s)', re.IGNORECASE)
+_SECTION_END_RE = re.compile(r'FLIGHT\(S\)\s+CALCULATED|GENERAL\s+INFORMATION|FLIGHT\s+TICKET', re.IGNORECASE)
+_WHITESPACE_RUN_RE = re.compile(r'\s*')
+_HEADER_RUN_RE = re.compile(r'[A-Z0-9\s\-]*', re.IGNORECASE)
+_AIRLINE_RUN_RE = re.compile(r'[A-Z\s]*', re.IGNORECASE)
+_HEADER_DASH_RE = re.compile(r'-(?=[A-Z\s])', re.IGNORECASE)
+
+# Linear mode only hands a bounded window of each section to the detail
+# patterns. Real Amadeus flight blocks are about 1 KB of 80-column lines with
+# short blank runs, so these caps never touch them, but they keep the regex
+# work per section constant, which makes the whole parse linear in the body size.
+MAX_LINEAR_SECTION_CHARS = 2048
+MAX_LINEAR_LINE_CHARS = 256
+MAX_LINEAR_BLANK_CHARS = 64
+
+_LONG_LINE_RE = re.compile(r'[^\r\n]{%d,}' % (MAX_LINEAR_LINE_CHARS + 1))
+_LONG_BLANK_RE = re.compile(r'[ \t]{%d,}' % (MAX_LINEAR_BLANK_CHARS + 1))
+_BLANK_LINES_RE = re.compile(r'\n(?:[ \t]*\r?\n){2,}')
+
+# An input email: an EML file (optionally gzipped), a message inside an mbox
+# file, a member of a zip or tar archive, or one already read from a tar stream;
+# or an already extracted booking record
+Source = Union[Path, MboxMessage, ArchiveMember, InlineMessage, RecordLine]
 
-@dataclass
-class FlightInfo:
-    """Data class for flight information."""
-    flight_number: str = ""
-    airline: str = ""
-    departure_city: str = ""
-    departure_airport: str = ""
-    departure_date: str = ""
-    departure_time: str = ""
-    arrival_city: str = ""
-    arrival_airport: str = ""
-    arrival_date: str = ""
-    arrival_time: str = ""
-    duration: str = ""
-    aircraft: str = ""
-    booking_ref: str = ""
-    class_type: str = ""
-    meal: str = ""
-    baggage: str = ""
-
-
-@dataclass
-class BookingInfo:
-    """Data class for booking information."""
-    passenger_name: str = ""
-    booking_ref: str = ""
-    date: str = ""
-    group: str = ""
-    ticket_number: str = ""
-    flights: List[FlightInfo] = None
-    
-    def __post_init__(self):
-        if self.flights is None:
-            self.flights = []
+# Members of a tar stream buffered per worker before each group is converted
+TAR_STREAM_GROUP_SIZE = 32
+
+PARSE_MODES = ("regex", "linear")
+MIME_MODES = ("full", "streaming")
+
+
+def _iter_flight_headers(text: str) -> Iterator[tuple[int, int]]:
+    """Yield (start, end) for every position where a flight header matches.
+
+    ``end`` is where the header capture group of ``_FLIGHT_SECTION_RE`` ends.
+    The greedy backtracking of that group is resolved directly: it ends after
+    the last dash of the header column run that is followed by a letter or
+    whitespace, plus the airline run after it. Runs, dashes and airline runs
+    are computed once and shared by every header candidate inside the same
+    run, so the total work is linear in ``len(text)``.
+    """
+    run_start = run_end = -1
+    dashes: List[int] = []
+    airline_dash = airline_end = -1
+    for word in _FLIGHT_WORD_RE.finditer(text):
+        start = word.start()
+        column = word.end()
+        if not run_start <= column < run_end:
+            run_start = column
+            run_end = _HEADER_RUN_RE.match(text, column).end()
+            dashes = [dash.start() for dash in _HEADER_DASH_RE.finditer(text, column, run_end)]
+        
+        # \s+ takes the leading whitespace, the column run needs one more character
+        spaces_end = _WHITESPACE_RUN_RE.match(text, column).end()
+        if dashes and dashes[-1] >= spaces_end + 1:
+            dash = dashes[-1]
+        elif dashes and dashes[-1] == spaces_end and spaces_end >= column + 2:
+            # Only reachable by giving back one leading space to the column run
+            dash = spaces_end
+        else:
+            continue
+        if dash != airline_dash:
+            airline_dash, airline_end = dash, _AIRLINE_RUN_RE.match(text, dash + 1).end()
+        yield start, airline_end
+
+
+def _iter_flight_sections_linear(text: str) -> Iterator[str]:
+    """Split ``text`` into flight sections exactly like ``_FLIGHT_SECTION_RE``, in linear time."""
+    # Without MULTILINE, "$" also matches just before a trailing newline
+    text_end = len(text) - 1 if text.endswith('\n') else len(text)
+    headers = _iter_flight_headers(text)
+    header = next(headers, None)
+    terminator = -1
+    
+    while header is not None:
+        start, body_start = header
+        
+        # The section runs up to the first header, terminator block or end of text at or after body_start
+        following = next(headers, None)
+        while following is not None and following[0] < body_start:
+            following = next(headers, None)
+        if terminator < body_start:
+            match = _SECTION_END_RE.search(text, body_start)
+            terminator = match.start() if match else len(text)
+        end = min(text_end if text_end >= body_start else len(text), terminator)
+        if following is not None:
+            end = min(end, following[0])
+        
+        yield text[start:end]
+        header = following
+
+
+# Flight number and airline, most specific format first
+_FLIGHT_HEADER_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    r'FLIGHT\s+([A-Z]{2}\s*\d+)\s*-\s*([A-Z\s]+?)(?:\s+[A-Z]{3}\s+\d+\s+[A-Z]+\s+\d+)',
+    r'FLIGHT\s+([A-Z]{2}\s*\d+)\s*-\s*([A-Z\s]+?)(?:\s+\w+\s+\d+)',
+    r'FLIGHT\s+([A-Z]{2}\s*\d+)\s*-\s*([A-Z\s]+)',
+))
+
+# Departure/arrival lines: city, optional country, airport and "DD MON HH:MM"
+_DEPARTURE_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    r'DEPARTURE:\s*([^,\(\r\n]+?)(?:,\s*([A-Z]{2}))?\s*\(([^)]+)\)\s*(\d{1,2}\s+[A-Z]{3}\s+\d{2}:\d{2})',
+    r'DEPARTURE:\s*([^,\(\r\n]+?),?\s*([A-Z]{2})?\s*\(([^)]+)\)\s*(\d{1,2}\s+[A-Z]{3}\s+\d{2}:\d{2})',
+    r'DEPARTURE:\s*([^\(\r\n]+?)\s*\(([^)]+)\)\s*(\d{1,2}\s+[A-Z]{3}\s+\d{2}:\d{2})',
+    r'DEPARTURE:\s*([^\r\n]+?)\s*(\d{1,2}\s+[A-Z]{3}\s+\d{2}:\d{2})',
+))
+_ARRIVAL_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    r'ARRIVAL:\s*([^,\(\r\n]+?)(?:,\s*([A-Z]{2}))?\s*\(([^)]+)\)(?:,\s*TERMINAL\s*\d+)?\s*(\d{1,2}\s+[A-Z]{3}\s+\d{2}:\d{2})',
+    r'ARRIVAL:\s*([^,\(\r\n]+?),?\s*([A-Z]{2})?\s*\(([^)]+)\)(?:,\s*TERMINAL\s*\d+)?\s*(\d{1,2}\s+[A-Z]{3}\s+\d{2}:\d{2})',
+    r'ARRIVAL:\s*([^\(\r\n]+?)\s*\(([^)]+)\)(?:,\s*TERMINAL\s*\d+)?\s*(\d{1,2}\s+[A-Z]{3}\s+\d{2}:\d{2})',
+    r'ARRIVAL:\s*([^\r\n]+?)\s*(\d{1,2}\s+[A-Z]{3}\s+\d{2}:\d{2})',
+))
+
+# Every departure/arrival pattern ends with this date and time, so sections
+# without one can skip them (they backtrack heavily on long blank columns)
+_ENDPOINT_DATETIME_RE = re.compile(r'\d{1,2}\s+[A-Z]{3}\s+\d{2}:\d{2}')
+
+# Additional flight details, first matching pattern wins per field
+_FLIGHT_DETAIL_PATTERNS = tuple(
+    (field, tuple(re.compile(pattern, re.IGNORECASE) for pattern in patterns))
+    for field, patterns in (
+        ('booking_ref', (
+            r'FLIGHT BOOKING REF:\s*([A-Z0-9/]+)',
+            r'BOOKING REF:\s*([A-Z0-9/]+)',
+        )),
+        ('class_type', (
+            r'RESERVATION CONFIRMED,\s*(ECONOMY)\s*\(([^)]+)\)',
+            r'(BUSINESS|ECONOMY|FIRST)\s*\(([^)]+)\)',
+            r'(ECONOMY|BUSINESS|FIRST)\s+CLASS',
+        )),
+        ('duration', (
+            r'DURATION:\s*(\d{1,2}:\d{2})',
+            r'DURATION\s*(\d{1,2}H\s*\d{2}M?)',
+            r'FLIGHT TIME:\s*(\d{1,2}:\d{2})',
+        )),
+        ('aircraft', (
+            r'EQUIPMENT:\s*([A-Z0-9\s\(\)-]+?)(?:\r?\n|$)',
+            r'AIRCRAFT:\s*([^\r\n]+?)(?:\r|\n|$)',
+            r'AC:\s*([^\r\n]+?)(?:\r|\n|$)',
+        )),
+        ('meal', (
+            r'MEAL:\s*([A-Z\s/]+(?:\r?\n\s+[A-Z\s/]+)*?)(?=\r?\n\s*(?:NON\s+STOP|FLIGHT|$))',
+            r'MEAL:\s*([^\r\n]+?)(?:\r?\n|$)',
+            r'CATERING:\s*([^\r\n]+?)(?:\r|\n|$)',
+        )),
+        ('baggage', (
+            r'BAGGAGE ALLOWANCE:\s*([A-Z0-9]+)',
+            r'BAGGAGE:\s*([A-Z0-9]+)',
+            r'BAG:\s*([A-Z0-9]+)',
+        )),
+    )
+)
+
+
+def _bound_section(section: str) -> str:
+    """Clip a flight section to the window the detail patterns see in linear mode.
+    
+    The section is cut at the last full line within MAX_LINEAR_SECTION_CHARS,
+    long lines and blank runs are clipped and runs of blank lines collapse to one.
+    """
+    if len(section) > MAX_LINEAR_SECTION_CHARS:
+        cut = section.rfind('\n', 0, MAX_LINEAR_SECTION_CHARS)
+        section = section[:cut if cut > 0 else MAX_LINEAR_SECTION_CHARS]
+    section = _LONG_LINE_RE.sub(lambda m: m.group(0)[:MAX_LINEAR_LINE_CHARS], section)
+    section = _LONG_BLANK_RE.sub(lambda m: m.group(0)[:MAX_LINEAR_BLANK_CHARS], section)
+    return _BLANK_LINES_RE.sub('\n\n', section)
+
+
+# Same detail patterns for linear mode. The first meal pattern drops its
+# redundant lazy continuation group: "[A-Z\s/]+" already spans line breaks, so
+# both forms capture the same text, but the nested quantifiers of the original
+# backtrack exponentially when the lookahead fails.
+_LINEAR_DETAIL_PATTERNS = tuple(
+    (field, (re.compile(
+        r'MEAL:\s*([A-Z\s/]+)(?=\r?\n\s*(?:NON\s+STOP|FLIGHT|$))', re.IGNORECASE
+    ),) + patterns[1:] if field == 'meal' else patterns)
+    for field, patterns in _FLIGHT_DETAIL_PATTERNS
+)
+
+
+def _first_match(patterns: tuple[re.Pattern, ...], text: str) -> Optional[re.Match]:
+    """Return the match of the first pattern that matches ``text``."""
+    for pattern in patterns:
+        match = pattern.search(text)
+        if match:
+            return match
+    return None
+
+
+def _parse_endpoint(match: re.Match) -> tuple[str, str, str, str]:
+    """Split a departure/arrival match into (city, airport, date, time)."""
+    groups = match.groups()
+    city = groups[0].strip()
+    airport = ""
+    
+    if len(groups) >= 3:
+        # Patterns with airport info: groups[0]=city, groups[1]=country?, groups[2]=airport, groups[3]=datetime
+        if len(groups) == 4 and groups[2]:  # Has airport info
+            airport = groups[2].strip()
+            datetime_str = groups[3]
+        else:
+            airport = groups[1].strip() if groups[1] else ""
+            datetime_str = groups[2] if len(groups) > 2 else groups[1]
+    else:
+        # Only city and datetime (handles ASCII column formatting)
+        datetime_str = groups[1]
+    
+    # Parse date and time
+    date = time = ""
+    datetime_parts = datetime_str.strip().split(' ')
+    if len(datetime_parts) >= 3:
+        date = f"{datetime_parts[0]} {datetime_parts[1]}"
+        time = datetime_parts[2]
+    return city, airport, date, time
+
+
+def _decode_text_part(part: email.message.Message) -> str:
+    """Decode a text part's transfer encoding and charset in one pass."""
+    payload = part.get_payload(decode=True)
+    if not payload:
+        return ""
+    charset = part.get_content_charset() or 'utf-8'
+    try:
+        return payload.decode(charset, errors='ignore')
+    except LookupError:
+        # Unknown charset label
+        return payload.decode('utf-8', errors='ignore')
+
+
+def _fsync_path(path: Path) -> None:
+    """fsync a file, or a directory so that renames into it survive a crash.
+    
+    Directories cannot be opened for fsync on Windows; there they are skipped.
+    """
+    if path.is_dir() and os.name != 'posix':
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _pid_alive(pid: int) -> bool:
+    """Whether process ``pid`` exists; always assumed on platforms without signal 0."""
+    if os.name != 'posix':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _parse_flight_section(section: str, detail_patterns=_FLIGHT_DETAIL_PATTERNS) -> FlightInfo:
+    """Extract every FlightInfo field from a single flight section."""
+    flight = FlightInfo()
+    
+    match = _first_match(_FLIGHT_HEADER_PATTERNS, section)
+    if match:
+        flight.flight_number = re.sub(r'\s+', ' ', match.group(1).strip())
+        flight.airline = match.group(2).strip()
+    
+    if _ENDPOINT_DATETIME_RE.search(section):
+        match = _first_match(_DEPARTURE_PATTERNS, section)
+        if match:
+            (flight.departure_city, flight.departure_airport,
+             flight.departure_date, flight.departure_time) = _parse_endpoint(match)
+        
+        match = _first_match(_ARRIVAL_PATTERNS, section)
+        if match:
+            (flight.arrival_city, flight.arrival_airport,
+             flight.arrival_date, flight.arrival_time) = _parse_endpoint(match)
+    
+    for field, patterns in detail_patterns:
+        match = _first_match(patterns, section)
+        if not match:
+            continue
+        if field == 'class_type':
+            if len(match.groups()) >= 2 and match.group(2):
+                flight.class_type = f"{match.group(1).title()} ({match.group(2)})"
+            else:
+                flight.class_type = match.group(1).title()
+        elif field in ('booking_ref', 'duration'):
+            setattr(flight, field, match.group(1))
+        else:
+            setattr(flight, field, match.group(1).strip())
+    
+    return flight
 
 
 class EMLToPDFConverter:
     """Converts EML files to PDF format."""
     
-    def __init__(self):
+    def __init__(
+        self,
+        logo: Optional[str] = None,
+        inline_logo: bool = False,
+        asset_cache_dir: Optional[Path] = None,
+        offline: bool = False,
+        parse_mode: str = "regex",
+        parse_timeout: Optional[float] = None,
+        fsync_every: int = 0,
+        task_timeout: Optional[float] = None,
+        max_memory: Optional[int] = None,
+        max_tasks_per_worker: Optional[int] = None,
+        subject_filter: Optional[str] = None,
+        mime_mode: str = "full",
+        render_cache_dir: Optional[Path] = None,
+        render_cache_size: int = DEFAULT_RENDER_CACHE_BYTES,
+        dedup: Optional[str] = None,
+        latest_only: bool = False,
+    ):
+        """Create a converter.
+        
+        Args:
+            logo: URL or local file path of the header logo (defaults to the company logo URL).
+            inline_logo: Embed the logo as a data URI, resolved once per process.
+            asset_cache_dir: Directory for cached remote assets (defaults to the user cache dir).
+            offline: Never fetch assets from the network; only cached or local assets are used.
+            parse_mode: "regex" for the original flight section regex, or "linear" for the
+                linear-time splitter with bounded per-section work (safe on adversarial bodies).
+            parse_timeout: Per-email parsing budget in seconds; exceeding it raises ParseTimeout.
+            fsync_every: 0 never fsyncs PDFs, 1 fsyncs each PDF before publishing it,
+                N > 1 fsyncs the PDFs published since the last group, and their
+                directories, once per N published PDFs.
+            task_timeout: Batch only: wall-clock limit in seconds per file, enforced by
+                killing the worker process rendering it.
+            max_memory: Batch only: address-space limit in bytes for each worker process.
+            max_tasks_per_worker: Batch only: recycle worker processes after this many files.
+            subject_filter: Batch only: regular expression the decoded Subject must
+                match (searched, case-insensitively) for an email to be converted.
+                Checked with a header-only pre-scan, so other emails are never fully parsed.
+            mime_mode: "full" parses the whole MIME tree with the standard parser;
+                "streaming" keeps only text/plain and text/html bodies and skips
+                attachments without buffering them, bounding memory by the text size.
+            render_cache_dir: Directory of previously rendered PDFs keyed by the hash of
+                their HTML, stylesheet and WeasyPrint version; None disables the cache.
+            render_cache_size: Size limit of the render cache in bytes (least recently
+                used PDFs are evicted beyond it).
+            dedup: Batch only: render one copy of each email, identified by its
+                Message-ID or, without one, a hash of its body. "report" lists the
+                other copies in duplicates.jsonl, "symlink" also links each of them
+                to the representative PDF. Remembered across runs in the output directory.
+            latest_only: Batch only: render only the newest email (by Date header) of
+                each booking reference and passenger, found with a pass that parses
+                booking details but not flights. Emails without a reference are kept.
+        
+        Setting any of the batch-only isolation options runs batch renders in
+        supervised worker processes even when jobs is 1.
+        """
+        if parse_mode not in PARSE_MODES:
+            raise ValueError(f"Unknown parse mode {parse_mode!r}, expected one of {', '.join(PARSE_MODES)}")
+        if mime_mode not in MIME_MODES:
+            raise ValueError(f"Unknown MIME mode {mime_mode!r}, expected one of {', '.join(MIME_MODES)}")
+        if dedup is not None and dedup not in DEDUP_MODES:
+            raise ValueError(f"Unknown dedup mode {dedup!r}, expected one of {', '.join(DEDUP_MODES)}")
+        
+        self.logo = logo
+        self.inline_logo = inline_logo
+        self.asset_cache_dir = asset_cache_dir
+        self.offline = offline
+        self.parse_mode = parse_mode
+        self.parse_timeout = parse_timeout
+        self.fsync_every = fsync_every
+        self._unsynced_outputs: List[Path] = []
+        self._swept_dirs: set[Path] = set()
+        self.task_timeout = task_timeout
+        self.max_memory = max_memory
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.subject_filter = subject_filter
+        self.mime_mode = mime_mode
+        self.dedup = dedup
+        self.latest_only = latest_only
+        self._sink: Union[ArchiveSink, RecordSink, None] = None
+        self._revision_scan: Optional[RevisionScan] = None
+        self._subject_re = re.compile(subject_filter, re.IGNORECASE) if subject_filter else None
+        self.assets = AssetCache(asset_cache_dir, offline=offline)
+        self.render_cache_dir = render_cache_dir
+        self.render_cache_size = render_cache_size
+        self.render_cache = RenderCache(render_cache_dir, render_cache_size) if render_cache_dir is not None else None
+        self._logo_src: Optional[str] = None
+        self._stylesheet: Optional["weasyprint.CSS"] = None
+        self._font_config: Optional["FontConfiguration"] = None
+        
         self.css_style = """
         @page { 
             size: A4; 
@@ -198,60 +629,106 @@ class EMLToPDFConverter:
         }
         """
     
+    @property
+    def parser_version(self) -> str:
+        """Identifies the parser that produced a PDF's content."""
+        return f"{PARSER_VERSION}/{self.parse_mode}"
+    
+    @property
+    def template_hash(self) -> str:
+        """Hash of everything besides the parsed content that shapes a PDF."""
+        template = '\0'.join((TEMPLATE_VERSION, self.css_style, self.logo or LOGO_URL, str(self.inline_logo)))
+        return hashlib.sha256(template.encode('utf-8')).hexdigest()
+    
+    @property
+    def font_config(self) -> "FontConfiguration":
+        """Font configuration shared by every document this converter renders."""
+        if self._font_config is None:
+            from weasyprint.text.fonts import FontConfiguration
+            self._font_config = FontConfiguration()
+        return self._font_config
+    
+    @property
+    def stylesheet(self) -> "weasyprint.CSS":
+        """The parsed stylesheet, built once and reused for every PDF."""
+        if self._stylesheet is None:
+            import weasyprint
+            self._stylesheet = weasyprint.CSS(
+                string=self.css_style,
+                font_config=self.font_config,
+                url_fetcher=self.assets,
+            )
+        return self._stylesheet
+    
+    @property
+    def logo_src(self) -> str:
+        """The ``src`` used for the header logo, resolved on first use."""
+        if self._logo_src is None:
+            source = self.logo or LOGO_URL
+            if not source.startswith(('http://', 'https://', 'data:', 'file:')):
+                # Local file bundled with the deployment
+                source = Path(source).resolve().as_uri()
+            if self.inline_logo:
+                try:
+                    source = self.assets.data_uri(source)
+                except Exception as e:
+                    console.print(f"⚠️  Could not inline logo {source}: {e}")
+            self._logo_src = source
+        return self._logo_src
+    
     def parse_eml_file(self, file_path: Path) -> email.message.Message:
         """Parse an EML file and return the email message object."""
-        with open(file_path, 'rb') as f:
-            return email.message_from_bytes(f.read())
+        if file_path.suffix.lower() == '.gz':
+            return self.parse_bytes(read_gzip(file_path))
+        if self.mime_mode == "streaming":
+            return read_text_message(file_path)
+        # Parse from a read-only mapping rather than reading the file into bytes
+        with mapped_file(file_path) as buffer:
+            return message_from_buffer(buffer)
+    
+    def parse_bytes(self, data: bytes) -> email.message.Message:
+        """Parse an email held in memory."""
+        if self.mime_mode == "streaming":
+            return parse_text_message(io.BytesIO(data))
+        return message_from_buffer(data)
+    
+    def parse_source(self, source: Source) -> email.message.Message:
+        """Parse any batch source: an EML file, an mbox message or an archive member."""
+        if isinstance(source, Path):
+            return self.parse_eml_file(source)
+        if isinstance(source, MboxMessage):
+            return self.parse_mbox_message(source)
+        # Archive members are decompressed here, in the worker converting them
+        return self.parse_bytes(source.read_bytes())
+    
+    def parse_mbox_message(self, message: MboxMessage) -> email.message.Message:
+        """Parse one message of an mbox file straight from its mapped byte range."""
+        if self.mime_mode == "streaming":
+            with open_range(message.path, message.start, message.end) as f:
+                return parse_text_message(f)
+        with mapped_range(message.path, message.start, message.end) as buffer:
+            return message_from_buffer(buffer)
     
     def extract_text_content(self, msg: email.message.Message) -> tuple[str, str]:
-        """Extract plain text and HTML content from email message with proper decoding."""
-        import quopri
-        
-        plain_text = ""
-        html_content = ""
-        
-        if msg.is_multipart():
-            for part in msg.walk():
-                if part.get_content_type() == "text/plain":
-                    charset = part.get_content_charset() or 'utf-8'
-                    encoding = part.get('Content-Transfer-Encoding', '').lower()
-                    
-                    raw_payload = part.get_payload(decode=True)
-                    if raw_payload:
-                        if encoding == 'quoted-printable':
-                            decoded_text = quopri.decodestring(raw_payload).decode(charset, errors='ignore')
-                        else:
-                            decoded_text = raw_payload.decode(charset, errors='ignore')
-                        
-                        # Clean up line breaks and formatting
-                        decoded_text = decoded_text.replace('=\n', '')  # Remove soft line breaks
-                        decoded_text = re.sub(r'=([0-9A-F]{2})', lambda m: chr(int(m.group(1), 16)), decoded_text)
-                        plain_text += decoded_text
-                        
-                elif part.get_content_type() == "text/html":
-                    charset = part.get_content_charset() or 'utf-8'
-                    html_content += part.get_payload(decode=True).decode(charset, errors='ignore')
-        else:
-            if msg.get_content_type() == "text/plain":
-                charset = msg.get_content_charset() or 'utf-8'
-                encoding = msg.get('Content-Transfer-Encoding', '').lower()
-                
-                raw_payload = msg.get_payload(decode=True)
-                if raw_payload:
-                    if encoding == 'quoted-printable':
-                        plain_text = quopri.decodestring(raw_payload).decode(charset, errors='ignore')
-                    else:
-                        plain_text = raw_payload.decode(charset, errors='ignore')
-                    
-                    # Clean up formatting
-                    plain_text = plain_text.replace('=\n', '')
-                    plain_text = re.sub(r'=([0-9A-F]{2})', lambda m: chr(int(m.group(1), 16)), plain_text)
-                    
-            elif msg.get_content_type() == "text/html":
-                charset = msg.get_content_charset() or 'utf-8'
-                html_content = msg.get_payload(decode=True).decode(charset, errors='ignore')
-        
-        return plain_text, html_content
+        """Extract plain text and HTML content from email message with proper decoding.
+        
+        Each text part is decoded exactly once: ``get_payload(decode=True)``
+        undoes the Content-Transfer-Encoding (quoted-printable or base64) and
+        the bytes are then decoded with the part's charset. Parts are joined
+        in a single pass at the end.
+        """
+        plain_parts: List[str] = []
+        html_parts: List[str] = []
+        
+        # walk() yields the message itself when it is not multipart
+        for part in msg.walk():
+            content_type = part.get_content_type()
+            if content_type == "text/plain":
+                plain_parts.append(_decode_text_part(part))
+            elif content_type == "text/html":
+                html_parts.append(_decode_text_part(part))
+        
+        return ''.join(plain_parts), ''.join(html_parts)
     
     def parse_booking_info(self, text: str, msg: email.message.Message) -> BookingInfo:
         """Genius-level regex parser for Amadeus booking information."""
@@ -335,158 +812,26 @@ class EMLToPDFConverter:
         
         return booking
     
-    def parse_flights(self, text: str) -> List[FlightInfo]:
-        """Genius-level regex parser for Amadeus flight information."""
-        flights = []
+    def parse_flights(self, text: str, deadline: Optional[float] = None) -> List[FlightInfo]:
+        """Genius-level regex parser for Amadeus flight information.
         
-        # Advanced multi-line flight section extraction including detail sections
-        # This pattern captures flight header + its detail section (booking ref, baggage, meal, aircraft)
-        flight_pattern = re.compile(
-            r'FLIGHT\s+([A-Z0-9\s\-]+\s*-\s*[A-Z\s]+).*?(?=FLIGHT\s+[A-Z0-9\s\-]+\s*-\s*[A-Z\s]+|FLIGHT\(S\)\s+CALCULATED|GENERAL\s+INFORMATION|FLIGHT\s+TICKET|$)',
-            re.DOTALL | re.IGNORECASE
-        )
+        In linear mode sections are split in linear time and the detail
+        patterns only see a bounded window of each section (see _bound_section).
+        If ``deadline`` (a time.monotonic() value) passes, ParseTimeout is raised.
+        """
+        flights = []
         
-        flight_sections = flight_pattern.findall(text)
-        full_matches = flight_pattern.finditer(text)
+        if self.parse_mode == "linear":
+            sections = (_bound_section(section) for section in _iter_flight_sections_linear(text))
+            detail_patterns = _LINEAR_DETAIL_PATTERNS
+        else:
+            sections = (match.group(0) for match in _FLIGHT_SECTION_RE.finditer(text))
+            detail_patterns = _FLIGHT_DETAIL_PATTERNS
         
-        for i, match in enumerate(full_matches):
-            section = match.group(0)
-            flight = FlightInfo()
-            
-            # Parse flight number and airline with advanced patterns
-            flight_header_patterns = [
-                r'FLIGHT\s+([A-Z]{2}\s*\d+)\s*-\s*([A-Z\s]+?)(?:\s+[A-Z]{3}\s+\d+\s+[A-Z]+\s+\d+)',
-                r'FLIGHT\s+([A-Z]{2}\s*\d+)\s*-\s*([A-Z\s]+?)(?:\s+\w+\s+\d+)',
-                r'FLIGHT\s+([A-Z]{2}\s*\d+)\s*-\s*([A-Z\s]+)'
-            ]
-            
-            for pattern in flight_header_patterns:
-                flight_match = re.search(pattern, section)
-                if flight_match:
-                    flight.flight_number = re.sub(r'\s+', ' ', flight_match.group(1).strip())
-                    flight.airline = flight_match.group(2).strip()
-                    break
-            
-            # Advanced departure parsing with multiple formats
-            departure_patterns = [
-                r'DEPARTURE:\s*([^,\(\r\n]+?)(?:,\s*([A-Z]{2}))?\s*\(([^)]+)\)\s*(\d{1,2}\s+[A-Z]{3}\s+\d{2}:\d{2})',
-                r'DEPARTURE:\s*([^,\(\r\n]+?),?\s*([A-Z]{2})?\s*\(([^)]+)\)\s*(\d{1,2}\s+[A-Z]{3}\s+\d{2}:\d{2})',
-                r'DEPARTURE:\s*([^\(\r\n]+?)\s*\(([^)]+)\)\s*(\d{1,2}\s+[A-Z]{3}\s+\d{2}:\d{2})',
-                r'DEPARTURE:\s*([^\r\n]+?)\s*(\d{1,2}\s+[A-Z]{3}\s+\d{2}:\d{2})'
-            ]
-            
-            for pattern in departure_patterns:
-                dep_match = re.search(pattern, section)
-                if dep_match:
-                    groups = dep_match.groups()
-                    flight.departure_city = groups[0].strip()
-                    
-                    if len(groups) >= 3:
-                        # Patterns with airport info: groups[0]=city, groups[1]=country?, groups[2]=airport, groups[3]=datetime  
-                        if len(groups) == 4 and groups[2]:  # Has airport info
-                            flight.departure_airport = groups[2].strip()
-                            datetime_str = groups[3]
-                        else:
-                            flight.departure_airport = groups[1].strip() if groups[1] else ""
-                            datetime_str = groups[2] if len(groups) > 2 else groups[1]
-                    else:
-                        # Pattern 4: only city and datetime
-                        datetime_str = groups[1]
-                        
-                    # Parse date and time
-                    datetime_parts = datetime_str.strip().split(' ')
-                    if len(datetime_parts) >= 3:
-                        flight.departure_date = f"{datetime_parts[0]} {datetime_parts[1]}"
-                        flight.departure_time = datetime_parts[2]
-                    break
-            
-            # Advanced arrival parsing with multiple formats  
-            arrival_patterns = [
-                r'ARRIVAL:\s*([^,\(\r\n]+?)(?:,\s*([A-Z]{2}))?\s*\(([^)]+)\)(?:,\s*TERMINAL\s*\d+)?\s*(\d{1,2}\s+[A-Z]{3}\s+\d{2}:\d{2})',
-                r'ARRIVAL:\s*([^,\(\r\n]+?),?\s*([A-Z]{2})?\s*\(([^)]+)\)(?:,\s*TERMINAL\s*\d+)?\s*(\d{1,2}\s+[A-Z]{3}\s+\d{2}:\d{2})',
-                r'ARRIVAL:\s*([^\(\r\n]+?)\s*\(([^)]+)\)(?:,\s*TERMINAL\s*\d+)?\s*(\d{1,2}\s+[A-Z]{3}\s+\d{2}:\d{2})',
-                r'ARRIVAL:\s*([^\r\n]+?)\s*(\d{1,2}\s+[A-Z]{3}\s+\d{2}:\d{2})'
-            ]
-            
-            for pattern in arrival_patterns:
-                arr_match = re.search(pattern, section)
-                if arr_match:
-                    groups = arr_match.groups()
-                    flight.arrival_city = groups[0].strip()
-                    
-                    if len(groups) >= 3:
-                        # Patterns with airport info: groups[0]=city, groups[1]=country?, groups[2]=airport, groups[3]=datetime  
-                        if len(groups) == 4 and groups[2]:  # Has airport info
-                            flight.arrival_airport = groups[2].strip()
-                            datetime_str = groups[3]
-                        else:
-                            flight.arrival_airport = groups[1].strip() if groups[1] else ""
-                            datetime_str = groups[2] if len(groups) > 2 else groups[1]
-                    else:
-                        # Pattern 4: only city and datetime (handles ASCII column formatting)
-                        datetime_str = groups[1]
-                        
-                    # Parse date and time
-                    datetime_parts = datetime_str.strip().split(' ')
-                    if len(datetime_parts) >= 3:
-                        flight.arrival_date = f"{datetime_parts[0]} {datetime_parts[1]}"
-                        flight.arrival_time = datetime_parts[2]
-                    break
-            
-            # Extract additional flight details with comprehensive patterns
-            detail_patterns = {
-                'booking_ref': [
-                    r'FLIGHT BOOKING REF:\s*([A-Z0-9/]+)',
-                    r'BOOKING REF:\s*([A-Z0-9/]+)'
-                ],
-                'class_type': [
-                    r'RESERVATION CONFIRMED,\s*(ECONOMY)\s*\(([^)]+)\)',
-                    r'(BUSINESS|ECONOMY|FIRST)\s*\(([^)]+)\)',
-                    r'(ECONOMY|BUSINESS|FIRST)\s+CLASS'
-                ],
-                'duration': [
-                    r'DURATION:\s*(\d{1,2}:\d{2})',
-                    r'DURATION\s*(\d{1,2}H\s*\d{2}M?)',
-                    r'FLIGHT TIME:\s*(\d{1,2}:\d{2})'
-                ],
-                'aircraft': [
-                    r'EQUIPMENT:\s*([A-Z0-9\s\(\)-]+?)(?:\r?\n|$)',
-                    r'AIRCRAFT:\s*([^\r\n]+?)(?:\r|\n|$)',
-                    r'AC:\s*([^\r\n]+?)(?:\r|\n|$)'
-                ],
-                'meal': [
-                    r'MEAL:\s*([A-Z\s/]+(?:\r?\n\s+[A-Z\s/]+)*?)(?=\r?\n\s*(?:NON\s+STOP|FLIGHT|$))',
-                    r'MEAL:\s*([^\r\n]+?)(?:\r?\n|$)',
-                    r'CATERING:\s*([^\r\n]+?)(?:\r|\n|$)'
-                ],
-                'baggage': [
-                    r'BAGGAGE ALLOWANCE:\s*([A-Z0-9]+)',
-                    r'BAGGAGE:\s*([A-Z0-9]+)',
-                    r'BAG:\s*([A-Z0-9]+)'
-                ]
-            }
-            
-            # Apply all detail patterns
-            for detail_type, patterns in detail_patterns.items():
-                for pattern in patterns:
-                    match = re.search(pattern, section, re.IGNORECASE)
-                    if match:
-                        if detail_type == 'booking_ref':
-                            flight.booking_ref = match.group(1)
-                        elif detail_type == 'class_type':
-                            if len(match.groups()) >= 2 and match.group(2):
-                                flight.class_type = f"{match.group(1).title()} ({match.group(2)})"
-                            else:
-                                flight.class_type = match.group(1).title()
-                        elif detail_type == 'duration':
-                            flight.duration = match.group(1)
-                        elif detail_type == 'aircraft':
-                            flight.aircraft = match.group(1).strip()
-                        elif detail_type == 'meal':
-                            flight.meal = match.group(1).strip()
-                        elif detail_type == 'baggage':
-                            flight.baggage = match.group(1).strip()
-                        break
+        for section in sections:
+            if deadline is not None and time.monotonic() > deadline:
+                raise ParseTimeout("Parsing exceeded its time budget")
+            flight = _parse_flight_section(section, detail_patterns)
             
             # Only add flight if it has essential information
             if flight.flight_number or (flight.departure_city and flight.arrival_city):
@@ -509,9 +854,9 @@ class EMLToPDFConverter:
     
     def format_company_header(self) -> str:
         """Format company header with logo and contact information."""
-        return """
+        return f"""
         <div class="company-header">
-            <img src="https://www.triptojapan.com/logo.svg" alt="Trip to Japan" class="company-logo">
+            <img src="{html.escape(self.logo_src)}" alt="Trip to Japan" class="company-logo">
         </div>
         <div class="company-info">
             <div class="contact-grid">
@@ -622,8 +967,12 @@ class EMLToPDFConverter:
         </div>
         """
     
-    def convert_to_html(self, msg: email.message.Message) -> str:
-        """Convert email message to structured HTML format."""
+    def extract_booking(self, msg: email.message.Message) -> BookingInfo:
+        """Extract the booking, its valid flights and CO2 estimate from an email.
+        
+        This is all the MIME decoding and regex work; ``render_html`` builds
+        the document from the result alone.
+        """
         plain_text, html_content = self.extract_text_content(msg)
         
         # Use plain text for parsing as it's more reliable for structured data
@@ -632,26 +981,38 @@ class EMLToPDFConverter:
         if not text_content:
             text_content = "No readable content found in email."
         
-        # Parse booking and flight information
-        booking_info = self.parse_booking_info(text_content, msg)
-        all_flights = self.parse_flights(text_content)
-        flights = self.filter_valid_flights(all_flights)
+        # Parse booking and flight information within the per-email time budget
+        with _time_budget(self.parse_timeout) as deadline:
+            booking_info = self.parse_booking_info(text_content, msg)
+            all_flights = self.parse_flights(text_content, deadline)
+        booking_info.flights = self.filter_valid_flights(all_flights)
+        
+        co2_match = re.search(r'CO2 EMISSIONS IS ([\d.]+) KG/PERSON', text_content, re.IGNORECASE)
+        if co2_match:
+            booking_info.co2_kg = co2_match.group(1)
         
+        return booking_info
+    
+    def convert_to_html(self, msg: email.message.Message) -> str:
+        """Convert email message to structured HTML format."""
+        return self.render_html(self.extract_booking(msg))
+    
+    def render_html(self, booking_info: BookingInfo) -> str:
+        """Build the HTML document for an extracted booking."""
         # Start building HTML
         html_doc = f"""
         <!DOCTYPE html>
         <html>
         <head>
             <meta charset="UTF-8">
-            <style>{self.css_style}</style>
         </head>
         <body>
         """
         
         # Add company logo only
-        html_doc += """
+        html_doc += f"""
         <div class="company-header">
-            <img src="https://www.triptojapan.com/logo.svg" alt="Trip to Japan" class="company-logo">
+            <img src="{html.escape(self.logo_src)}" alt="Trip to Japan" class="company-logo">
         </div>
         """
         
@@ -659,7 +1020,7 @@ class EMLToPDFConverter:
         html_doc += self.format_booking_summary(booking_info)
         
         # Add flight cards
-        for i, flight in enumerate(flights, 1):
+        for i, flight in enumerate(booking_info.flights, 1):
             html_doc += self.format_flight_card(flight, i)
         
         # Add ticket information if available
@@ -673,11 +1034,10 @@ class EMLToPDFConverter:
             """
         
         # Add any additional notes or CO2 info if found
-        co2_match = re.search(r'CO2 EMISSIONS IS ([\d.]+) KG/PERSON', text_content, re.IGNORECASE)
-        if co2_match:
+        if booking_info.co2_kg:
             html_doc += f"""
             <div style="border: 1px solid #000; padding: 10px; margin-top: 15px; font-size: 9px; text-align: center;">
-                <strong>ENVIRONMENTAL IMPACT:</strong> Estimated CO2 emissions: {co2_match.group(1)} kg per person<br>
+                <strong>ENVIRONMENTAL IMPACT:</strong> Estimated CO2 emissions: {html.escape(booking_info.co2_kg)} kg per person<br>
                 Source: ICAO Carbon Emissions Calculator
             </div>
             """
@@ -708,41 +1068,728 @@ class EMLToPDFConverter:
         
         return html_doc
     
+    @contextmanager
+    def _atomic_output(self, output_path: Path) -> Iterator[Path]:
+        """Yield a sibling temp path and publish it as ``output_path`` once written.
+        
+        A render that fails or is killed midway never leaves a truncated file
+        under the final name. With fsync_every == 1 each file is fsync'd
+        before it is published and its directory right after, so the rename
+        survives a crash too; with a larger value the published files and
+        their directories are fsync'd in groups of fsync_every (see sync_outputs).
+        """
+        tmp_path = output_path.with_name(f".{output_path.name}.{os.getpid()}.tmp")
+        try:
+            yield tmp_path
+            if self.fsync_every == 1:
+                _fsync_path(tmp_path)
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        
+        if self.fsync_every == 1:
+            _fsync_path(output_path.parent)
+        elif self.fsync_every > 1:
+            self._unsynced_outputs.append(output_path)
+            if len(self._unsynced_outputs) >= self.fsync_every:
+                self.sync_outputs()
+    
+    def _sweep_temp_pdfs(self, directories: Iterable[Path]) -> None:
+        """Delete temp PDFs left in ``directories`` by renders killed before publishing.
+        
+        Only files whose writing process is gone are removed, so another run
+        rendering into the same directory keeps its own. Each directory is
+        swept once per converter.
+        """
+        removed = 0
+        for directory in directories:
+            if directory in self._swept_dirs:
+                continue
+            self._swept_dirs.add(directory)
+            try:
+                with os.scandir(directory) as entries:
+                    stale = [
+                        entry.path for entry in entries
+                        if (match := _TEMP_PDF_RE.match(entry.name)) and not _pid_alive(int(match.group(1)))
+                    ]
+            except OSError:
+                continue
+            for path in stale:
+                try:
+                    os.unlink(path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+        if removed:
+            console.print(f"🧹 Removed [bold]{removed}[/bold] temporary files left by interrupted renders")
+    
+    @contextmanager
+    def output_archive(self, path: Path) -> Iterator[ArchiveSink]:
+        """Write every PDF converted by batches inside the block into one archive.
+        
+        ``path`` is a zip or tar (optionally compressed) file. PDFs keep their
+        paths relative to the batch output directory, and the quarantine list
+        is stored in the archive as well.
+        """
+        with ArchiveSink(path) as sink, self._output_sink(sink):
+            yield sink
+    
+    @contextmanager
+    def output_records(self, target: Union[Path, TextIO], format: str = "jsonl") -> Iterator[RecordSink]:
+        """Extract the emails of batches inside the block into records instead of rendering them.
+        
+        ``target`` (a file, or a text stream such as stdout) receives one
+        JSON line per email (see ``records``), which ``records_convert``
+        later renders without parsing any email again, or CSV rows with one
+        row per flight. Emails that fail to extract are written as error
+        records.
+        """
+        with RecordSink(target, format) as sink, self._output_sink(sink):
+            yield sink
+    
+    @contextmanager
+    def _output_sink(self, sink: Union[ArchiveSink, RecordSink]) -> Iterator[None]:
+        self._sink = sink
+        try:
+            yield
+        finally:
+            self._sink = None
+    
+    def sync_outputs(self) -> None:
+        """fsync every PDF published since the last sync, then each of their directories once."""
+        outputs, self._unsynced_outputs = self._unsynced_outputs, []
+        for output_path in outputs:
+            _fsync_path(output_path)
+        for directory in dict.fromkeys(output_path.parent for output_path in outputs):
+            _fsync_path(directory)
+    
     def convert_eml_to_pdf(self, eml_path: Path, output_path: Optional[Path] = None) -> Path:
         """Convert an EML file to PDF."""
         if not eml_path.exists():
             raise FileNotFoundError(f"EML file not found: {eml_path}")
         
         if output_path is None:
-            output_path = eml_path.with_suffix('.pdf')
+            if eml_path.name.lower().endswith('.eml.gz'):
+                output_path = eml_path.parent / pdf_path(eml_path.name)
+            else:
+                output_path = eml_path.with_suffix('.pdf')
         
         console.print(f"Converting [bold blue]{eml_path.name}[/bold blue] to PDF...")
         
         # Parse the EML file
         msg = self.parse_eml_file(eml_path)
+        return self._render_message(msg, eml_path.name, output_path)
+    
+    def convert_bytes(self, eml: bytes) -> bytes:
+        """Convert an email held in memory to PDF bytes.
         
-        # Convert to HTML
-        html_content = self.convert_to_html(msg)
+        Nothing is read from or written to disk besides the shared asset
+        cache, so this suits servers that receive EML and return PDF over
+        the network. Unlike the file-based methods it prints nothing and
+        raises on failure instead of returning None.
+        """
+        return self.render_pdf(self.convert_to_html(self.parse_bytes(eml)))
+    
+    def convert_stream(self, eml: BinaryIO, pdf: Optional[BinaryIO] = None) -> Optional[bytes]:
+        """Convert an email read from a binary file object.
         
-        # Generate PDF using WeasyPrint with safer settings
+        The PDF is written to ``pdf`` if given, otherwise returned as bytes.
+        In streaming MIME mode a seekable input is parsed as it is read, so
+        attachments are never held in memory.
+        """
+        if self.mime_mode == "streaming" and eml.seekable():
+            msg = parse_text_message(eml)
+        else:
+            msg = self.parse_bytes(eml.read())
+        return self.render_pdf(self.convert_to_html(msg), pdf)
+    
+    def convert_source_to_bytes(self, source: Source) -> Optional[bytes]:
+        """Convert any batch source to PDF bytes, without writing a file."""
+        name = source.name
+        console.print(f"Converting [bold blue]{name}[/bold blue] to PDF...")
+        return self._render_html(self._source_html(source), name, None)
+    
+    def convert_source(self, source: Source, output_path: Path) -> Path:
+        """Convert any batch source (see ``Source``) to PDF."""
+        if isinstance(source, Path):
+            return self.convert_eml_to_pdf(source, output_path)
+        console.print(f"Converting [bold blue]{source.name}[/bold blue] to PDF...")
+        return self._render_html(self._source_html(source), source.name, output_path)
+    
+    def extract_record(self, source: Source, name: str) -> Dict[str, Any]:
+        """Extract a batch source into a record whose PDF will be called ``name``."""
+        booking = self.extract_booking(self.parse_source(source))
+        return booking_record(booking, str(source), name, self.parser_version)
+    
+    def _source_html(self, source: Source) -> str:
+        if isinstance(source, RecordLine):
+            # Already extracted: no MIME or regex work left
+            return self.render_html(booking_from_record(source.record()))
+        return self.convert_to_html(self.parse_source(source))
+    
+    def _render_message(
+        self, msg: email.message.Message, name: str, output_path: Optional[Path]
+    ) -> Union[Path, bytes, None]:
+        """Render a parsed message to ``output_path``, or return the PDF bytes if it is None."""
+        return self._render_html(self.convert_to_html(msg), name, output_path)
+    
+    def _render_html(self, html_content: str, name: str, output_path: Optional[Path]) -> Union[Path, bytes, None]:
         try:
-            import warnings
-            warnings.filterwarnings('ignore')
-            
-            # Create HTML document with base_url to avoid network requests
-            html_doc = weasyprint.HTML(string=html_content, base_url='.')
-            
-            # Write PDF with safer settings
-            html_doc.write_pdf(output_path, presentational_hints=True)
-            console.print(f"✓ Successfully created [bold green]{output_path.name}[/bold green]")
-            return output_path
+            return self._publish_pdf(html_content, name, output_path)
         except Exception as e:
-            console.print(f"❌ Error converting {eml_path.name}: {e}")
+            console.print(f"❌ Error converting {name}: {e}")
             # Don't re-raise the exception to continue processing other files
             return None
     
-    def batch_convert(self, input_dir: Path, output_dir: Optional[Path] = None) -> list[Path]:
-        """Convert all EML files in a directory to PDF."""
+    def _publish_pdf(self, html_content: str, name: str, output_path: Optional[Path]) -> Union[Path, bytes]:
+        """Render HTML to ``output_path``, or return the PDF bytes if it is None; raises on failure."""
+        if output_path is None:
+            pdf = self.render_pdf(html_content)
+            console.print(f"✓ Successfully rendered [bold green]{name}[/bold green]")
+            return pdf
+        
+        with self._atomic_output(output_path) as tmp_path:
+            self.render_pdf(html_content, tmp_path)
+        console.print(f"✓ Successfully created [bold green]{output_path.name}[/bold green]")
+        return output_path
+    
+    def warm_up(self) -> None:
+        """Import WeasyPrint, load fonts and the stylesheet, and render a throwaway PDF.
+        
+        Long-running processes call this up front so that their first real
+        email does not pay for imports, font discovery and first-render setup.
+        """
+        self.render_pdf(self.convert_to_html(email.message_from_string("Subject: warm-up\n\n")))
+    
+    def render_pdf(self, html_content: str, target: Union[Path, BinaryIO, None] = None) -> Optional[bytes]:
+        """Render HTML from ``convert_to_html`` to PDF.
+        
+        The PDF is written to ``target`` (a path or a writable binary file
+        object), or returned as bytes when no target is given. Errors are
+        raised to the caller. With a render cache, a document whose HTML was
+        rendered before is hardlinked or copied from the cache instead.
+        """
+        import warnings
+        warnings.filterwarnings('ignore')
+        import weasyprint
+        
+        if self.render_cache is None:
+            return self._write_pdf(html_content, target)
+        
+        key = self.render_cache.key(html_content, self.css_style, weasyprint.__version__)
+        if isinstance(target, Path):
+            if not self.render_cache.fetch(key, target):
+                self._write_pdf(html_content, target)
+                self.render_cache.store(key, target)
+            return None
+        
+        pdf = self.render_cache.read(key)
+        if pdf is None:
+            pdf = self._write_pdf(html_content)
+            self.render_cache.store_bytes(key, pdf)
+        if target is None:
+            return pdf
+        target.write(pdf)
+        return None
+    
+    def _write_pdf(self, html_content: str, target: Union[Path, BinaryIO, None] = None) -> Optional[bytes]:
+        import weasyprint
+        
+        # Create HTML document with base_url to avoid network requests;
+        # remote assets such as the logo go through the shared asset cache
+        html_doc = weasyprint.HTML(string=html_content, base_url='.', url_fetcher=self.assets)
+        
+        # Reuse the pre-parsed stylesheet and fonts
+        return html_doc.write_pdf(
+            target,
+            stylesheets=[self.stylesheet],
+            font_config=self.font_config,
+            presentational_hints=True,
+        )
+    
+    def _worker_kwargs(self) -> Dict[str, Any]:
+        """Constructor arguments that recreate this converter inside a worker process."""
+        return {
+            'logo': self.logo,
+            'inline_logo': self.inline_logo,
+            'asset_cache_dir': self.asset_cache_dir,
+            'offline': self.offline,
+            'parse_mode': self.parse_mode,
+            'parse_timeout': self.parse_timeout,
+            'fsync_every': self.fsync_every,
+            'mime_mode': self.mime_mode,
+            'render_cache_dir': self.render_cache_dir,
+            'render_cache_size': self.render_cache_size,
+        }
+    
+    def _convert_task(self, task: tuple[Source, Path]) -> tuple[Union[Path, bytes, None], Optional[str]]:
+        """Convert one (source, pdf) pair, returning the PDF path (or bytes) or the failure message.
+        
+        Render failures keep WeasyPrint's reason, as ``_convert_request`` does,
+        so the quarantine file says why a PDF is missing.
+        """
+        source, output_file = task
+        try:
+            if isinstance(output_file, RecordEntry):
+                # The parent process writes it into the record file
+                return self.extract_record(source, output_file.name), None
+            console.print(f"Converting [bold blue]{source.name}[/bold blue] to PDF...")
+            html_content = self._source_html(source)
+        except ParseTimeout as e:
+            return None, f"timed out ({e})"
+        except Exception as e:
+            return None, str(e)
+        # Archive entries come back as bytes, for the parent to write into the output archive
+        target = None if isinstance(output_file, ArchiveEntry) else output_file
+        try:
+            return self._publish_pdf(html_content, source.name, target), None
+        except Exception as e:
+            return None, f"rendering failed: {e}"
+    
+    def _convert_request(self, eml: bytes) -> tuple[Optional[bytes], Optional[str], bool]:
+        """Convert one email for the server, as ``convert_bytes`` does.
+        
+        Returns the PDF bytes or the failure message, and whether the
+        failure was in rendering rather than in the email itself.
+        """
+        try:
+            html_content = self.convert_to_html(self.parse_bytes(eml))
+        except ParseTimeout as e:
+            return None, f"timed out ({e})", False
+        except Exception as e:
+            return None, str(e), False
+        try:
+            return self.render_pdf(html_content), None, False
+        except Exception as e:
+            return None, f"rendering failed: {e}", True
+    
+    def _convert_many(
+        self,
+        tasks: list[tuple[Source, Path]],
+        jobs: int = 1,
+        on_result: Optional[Callable[[Source, Optional[Path], Optional[str]], None]] = None,
+    ) -> list[Path]:
+        """Convert (eml, pdf) pairs, spreading them across worker processes when jobs > 1.
+        
+        Each worker process builds its own converter once and keeps it warm for
+        all files it receives. Workers are supervised (see SupervisedPool), so a
+        crash, hang or memory blow-up fails only the file being rendered.
+        Results and failures are reported in input order, and passed to
+        ``on_result(eml, pdf_or_None, error_or_None)`` as they arrive.
+        A jobs value of 0 uses every available CPU core.
+        """
+        if jobs <= 0:
+            jobs = os.cpu_count() or 1
+        jobs = min(jobs, len(tasks))
+        isolate = bool(self.task_timeout or self.max_memory or self.max_tasks_per_worker)
+        
+        converted_files = []
+        
+        def collect(outcomes):
+            for (eml_file, output_file), (converted_file, error) in zip(tasks, outcomes):
+                if isinstance(converted_file, (bytes, dict)):
+                    converted_file = self._sink.add(output_file.name, converted_file)
+                if error is not None:
+                    console.print(f"❌ Failed to convert {eml_file.name}: {error}")
+                elif converted_file:  # Only add if conversion was successful
+                    converted_files.append(converted_file)
+                if on_result is not None:
+                    on_result(eml_file, converted_file, error)
+        
+        if jobs <= 1 and not (isolate and tasks):
+            collect(map(self._convert_task, tasks))
+        else:
+            from .supervisor import SupervisedPool
+            console.print(f"Using [bold]{jobs}[/bold] supervised worker processes")
+            pool = SupervisedPool(
+                jobs,
+                self._worker_kwargs(),
+                task_timeout=self.task_timeout,
+                memory_limit=self.max_memory,
+                max_tasks_per_child=self.max_tasks_per_worker,
+            )
+            collect(pool.map(tasks))
+            # Workers may be killed with a partial sync group outstanding;
+            # add their output so the final sync below covers it
+            if self.fsync_every > 1 and self._sink is None:
+                self._unsynced_outputs.extend(converted_files)
+        
+        self.sync_outputs()
+        return converted_files
+    
+    def _prescan(
+        self, tasks: list[tuple[Source, Path]], on_rejected: Optional[Callable[[Source], None]] = None
+    ) -> list[tuple[Source, Path]]:
+        """Drop tasks whose headers show they should not be converted, passing each to ``on_rejected``."""
+        if self._subject_re is None:
+            return tasks
+        
+        selected = []
+        for eml_file, output_file in tasks:
+            if self._passes_prescan(eml_file):
+                selected.append((eml_file, output_file))
+            elif on_rejected is not None:
+                on_rejected(eml_file)
+        if len(selected) < len(tasks):
+            console.print(f"Skipping [bold]{len(tasks) - len(selected)}[/bold] emails not matching the subject filter")
+        return selected
+    
+    def _passes_prescan(self, eml_file: Source) -> bool:
+        """Whether the headers of ``eml_file`` pass the subject filter, if any."""
+        if self._subject_re is None:
+            return True
+        try:
+            if isinstance(eml_file, Path):
+                headers = read_headers(eml_file)
+            else:
+                headers = eml_file.read_headers()
+        except OSError:
+            # Unreadable: let the conversion report it
+            return True
+        return bool(self._subject_re.search(header_text(headers, 'Subject')))
+    
+    def _dedupe(
+        self, tasks: list[tuple[Source, Path]], output_dir: Path, seen: SeenSet
+    ) -> tuple[list[tuple[Source, Path]], Dict[Path, str], list[tuple[Source, Path, Path, str]]]:
+        """Split tasks into one representative per message and the duplicates of it.
+        
+        Returns the tasks to convert, the dedup key of each representative's
+        PDF, and (source, pdf, representative pdf, key) for every duplicate.
+        A message already rendered by an earlier run into a PDF that still
+        exists is represented by that PDF.
+        """
+        representatives: Dict[str, Path] = {}
+        keys: Dict[Path, str] = {}
+        selected = []
+        duplicates = []
+        for eml_file, output_file in tasks:
+            try:
+                key = message_key(eml_file)
+            except OSError:
+                # Unreadable: let the conversion report it
+                key = None
+            if key is None:
+                selected.append((eml_file, output_file))
+                continue
+            
+            original = representatives.get(key)
+            if original is None:
+                previous = seen.get(key)
+                if previous is not None and previous != output_file.relative_to(output_dir).as_posix():
+                    if (output_dir / previous).exists():
+                        original = output_dir / previous
+            if original is not None:
+                duplicates.append((eml_file, output_file, original, key))
+                continue
+            
+            representatives[key] = output_file
+            keys[output_file] = key
+            selected.append((eml_file, output_file))
+        if duplicates:
+            console.print(
+                f"Skipping [bold]{len(duplicates)}[/bold] duplicate emails, "
+                f"see {output_dir / DUPLICATES_NAME}"
+            )
+        return selected, keys, duplicates
+    
+    def _revision(self, source: Source) -> Optional[tuple[tuple[str, str], float]]:
+        """The booking an email is a revision of and when it was sent, or None if unknown.
+        
+        Only the headers and text bodies are read, as in streaming MIME mode
+        whatever ``mime_mode`` is, and only the booking details are extracted,
+        skipping the flight sections, which are most of the parsing work.
+        """
+        if isinstance(source, RecordLine):
+            return None
+        try:
+            msg = self._parse_text_parts(source)
+            plain_text, html_content = self.extract_text_content(msg)
+            with _time_budget(self.parse_timeout):
+                booking = self.parse_booking_info(plain_text or html_content, msg)
+        except Exception:
+            # Let the conversion report it
+            return None
+        key = revision_key(booking)
+        return (key, message_time(msg)) if key is not None else None
+    
+    @staticmethod
+    def _parse_text_parts(source: Source) -> email.message.Message:
+        """Parse a batch source keeping only its headers and text bodies; attachments are skipped unread."""
+        if isinstance(source, MboxMessage):
+            with open_range(source.path, source.start, source.end) as f:
+                return parse_text_message(f)
+        if isinstance(source, Path) and source.suffix.lower() != '.gz':
+            return read_text_message(source)
+        data = read_gzip(source) if isinstance(source, Path) else source.read_bytes()
+        return parse_text_message(io.BytesIO(data))
+    
+    def _scan_revisions(self, tasks: Iterable[tuple[Source, Path]]) -> RevisionScan:
+        scan = RevisionScan()
+        for source, output_file in tasks:
+            revision = self._revision(source)
+            if revision is not None:
+                scan.add(Journal.key(source), str(source), output_file, *revision)
+        return scan
+    
+    @contextmanager
+    def _whole_run_revisions(self, tasks: Iterable[tuple[Source, Path]]) -> Iterator[None]:
+        """With ``latest_only``, compare revisions across all ``tasks`` of a run converted in several batches.
+        
+        ``tasks`` is only iterated with ``latest_only``, so it may be a
+        generator that reads a tar stream.
+        """
+        if not self.latest_only:
+            yield
+            return
+        console.print("Scanning the whole input for the latest revision of each booking...")
+        self._revision_scan = self._scan_revisions(
+            (source, output_file) for source, output_file in tasks if self._passes_prescan(source)
+        )
+        try:
+            yield
+        finally:
+            self._revision_scan = None
+    
+    def _select_latest(
+        self, tasks: list[tuple[Source, Path]], output_dir: Path, index: RevisionIndex, append: bool = False
+    ) -> tuple[list[tuple[Source, Path]], Dict[Path, tuple[tuple[str, str], float]], list[Source]]:
+        """Drop every email superseded by a newer revision of the same booking.
+        
+        Revisions are grouped by booking reference and passenger and the one
+        with the latest Date wins, the earlier one on a tie. They are compared
+        within the batch, or across the whole run when it is converted in
+        several batches (see ``_whole_run_revisions``). A revision rendered by
+        an earlier run (see ``RevisionIndex``) wins if it is at least as new
+        and its PDF still exists. Emails without a reference, or that fail the
+        revision pass, are kept for conversion to handle.
+        
+        Returns the tasks to convert, the revision key and send time of each
+        latest revision's PDF, and the superseded sources.
+        """
+        scan = self._revision_scan or self._scan_revisions(tasks)
+        
+        # PDFs rendered by earlier runs that supersede every revision of this run
+        rendered_winners: Dict[tuple[str, str], Optional[Path]] = {}
+        
+        def rendered_winner(key: tuple[str, str]) -> Optional[Path]:
+            if key not in rendered_winners:
+                rendered_winners[key] = None
+                rendered = index.get(key)
+                if rendered is not None:
+                    rendered_sent, name = rendered
+                    latest_sent, _, _, latest_file = scan.latest[key]
+                    if (
+                        name != latest_file.relative_to(output_dir).as_posix()
+                        and rendered_sent >= latest_sent
+                        and (output_dir / name).exists()
+                    ):
+                        rendered_winners[key] = output_dir / name
+            return rendered_winners[key]
+        
+        selected = []
+        latest_files = {}
+        superseded = []
+        for eml_file, output_file in tasks:
+            source_id = Journal.key(eml_file)
+            revision = scan.revisions.get(source_id)
+            if revision is None:
+                selected.append((eml_file, output_file))
+                continue
+            key = revision[0]
+            _, latest_id, latest_name, _ = scan.latest[key]
+            winner = rendered_winner(key)
+            if winner is None and latest_id == source_id:
+                selected.append((eml_file, output_file))
+                latest_files[output_file] = revision
+            else:
+                superseded.append((eml_file, winner or latest_name, key))
+        if superseded:
+            message = (
+                f"Skipping [bold]{len(superseded)}[/bold] superseded revisions of "
+                f"{len({key for _, _, key in superseded})} bookings"
+            )
+            if self._sink is None:
+                # A sink's output_dir is only a temporary state directory
+                write_superseded(output_dir / SUPERSEDED_NAME, superseded, append=append)
+                message += f", see {output_dir / SUPERSEDED_NAME}"
+            console.print(message)
+        return selected, latest_files, [source for source, _, _ in superseded]
+    
+    def _link_duplicates(self, duplicates: list[tuple[Source, Path, Path, str]]) -> list[Path]:
+        """Symlink each duplicate's PDF path to its representative's PDF."""
+        linked = []
+        for _, output_file, original, _ in duplicates:
+            if not original.exists():
+                # The representative failed to convert
+                continue
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+            output_file.unlink(missing_ok=True)
+            output_file.symlink_to(os.path.relpath(original, output_file.parent))
+            linked.append(output_file)
+        return linked
+    
+    def _run_batch(
+        self,
+        tasks: list[tuple[Source, Path]],
+        output_dir: Path,
+        jobs: int = 1,
+        incremental: bool = False,
+        resume: bool = False,
+        on_converted: Optional[Callable[[Source, Path], None]] = None,
+        on_skipped: Optional[Callable[[Source], None]] = None,
+        on_filtered: Optional[Callable[[Source], None]] = None,
+    ) -> list[Path]:
+        """Convert batch tasks, journaling each finished file in ``output_dir``.
+        
+        Emails rejected by the header pre-scan are dropped first and never
+        fully parsed. With ``dedup``, copies of a message already in the batch
+        or rendered by an earlier run are skipped and listed in the duplicates
+        file (and symlinked to the representative PDF). With ``latest_only``,
+        emails superseded by a newer revision of their booking, in the batch
+        or rendered by an earlier run, are skipped and listed in the
+        superseded file. Incremental runs skip inputs that the
+        output-directory manifest shows as unchanged. Resumed runs skip every
+        file the journal of an earlier, interrupted run already completed or
+        failed. PDFs skipped either way are returned alongside the newly
+        converted ones. Files that fail are listed with their failure reason
+        in the quarantine file. Like it, the duplicates and superseded files
+        list this run's skips only, and are appended to by resumed runs.
+        ``on_converted(source, pdf)`` is called for every newly converted
+        source, ``on_skipped(source)`` for every duplicate and every
+        source superseded by another revision, and ``on_filtered(source)``
+        for every source the pre-scan rejected.
+        """
+        if not resume and self._sink is None:
+            # Each list is only written when this run has entries for it, so
+            # drop the previous run's rather than leave it describing files
+            # that no longer fail
+            for name in (QUARANTINE_NAME, DUPLICATES_NAME, SUPERSEDED_NAME):
+                (output_dir / name).unlink(missing_ok=True)
+        if self._sink is None:
+            self._sweep_temp_pdfs({output_file.parent for _, output_file in tasks})
+        
+        tasks = self._prescan(tasks, on_filtered)
+        skipped_files = []
+        
+        seen = None
+        dedup_keys: Dict[Path, str] = {}
+        duplicates = []
+        if self.dedup is not None:
+            seen = SeenSet.load(output_dir)
+            tasks, dedup_keys, duplicates = self._dedupe(tasks, output_dir, seen)
+            if on_skipped is not None:
+                for source, _, _, _ in duplicates:
+                    on_skipped(source)
+        
+        revision_index = None
+        latest_files: Dict[Path, tuple[tuple[str, str], float]] = {}
+        if self.latest_only:
+            revision_index = RevisionIndex.load(output_dir)
+            tasks, latest_files, superseded = self._select_latest(tasks, output_dir, revision_index, append=resume)
+            if on_skipped is not None:
+                for source in superseded:
+                    on_skipped(source)
+        
+        manifest = None
+        if incremental:
+            manifest = Manifest.load(output_dir, self.parser_version, self.template_hash)
+            pending = []
+            for eml_file, output_file in tasks:
+                # The manifest tracks files on disk and members of indexed archives;
+                # mbox messages and tar stream members are always converted
+                if isinstance(eml_file, (Path, ArchiveMember)) and manifest.is_current(eml_file, output_file):
+                    skipped_files.append(output_file)
+                else:
+                    pending.append((eml_file, output_file))
+            if len(pending) < len(tasks):
+                console.print(f"Skipping [bold]{len(tasks) - len(pending)}[/bold] unchanged files")
+            tasks = pending
+        
+        journal_path = output_dir / JOURNAL_NAME
+        if resume:
+            finished = Journal.read(journal_path)
+            pending = []
+            for eml_file, output_file in tasks:
+                entry = finished.get(Journal.key(eml_file))
+                if entry is None:
+                    pending.append((eml_file, output_file))
+                elif entry['status'] == 'ok':
+                    skipped_files.append(output_file)
+            if len(pending) < len(tasks):
+                console.print(f"Resuming: skipping [bold]{len(tasks) - len(pending)}[/bold] already processed files")
+            tasks = pending
+        
+        if self._sink is not None:
+            # PDFs (or records) go into the output sink under their path relative to output_dir
+            tasks = [
+                (source, self._sink.entry(output_file.relative_to(output_dir).as_posix()))
+                for source, output_file in tasks
+            ]
+        
+        quarantined = []
+        with Journal(journal_path, append=resume) as journal:
+            def on_result(eml_file: Path, converted_file: Optional[Path], error: Optional[str]):
+                journal.record(eml_file, converted_file, error)
+                if not converted_file:
+                    quarantined.append((eml_file, error or "PDF rendering failed"))
+                else:
+                    if manifest is not None and isinstance(eml_file, (Path, ArchiveMember)):
+                        manifest.record(eml_file, converted_file)
+                    if seen is not None and converted_file in dedup_keys:
+                        seen.add(dedup_keys[converted_file], converted_file.relative_to(output_dir).as_posix())
+                    if revision_index is not None and converted_file in latest_files:
+                        key, sent = latest_files[converted_file]
+                        revision_index.add(key, sent, converted_file.relative_to(output_dir).as_posix())
+                    if on_converted is not None:
+                        on_converted(eml_file, converted_file)
+            
+            try:
+                converted_files = self._convert_many(tasks, jobs, on_result)
+            finally:
+                if manifest is not None:
+                    manifest.save()
+                if seen is not None:
+                    seen.save()
+                if revision_index is not None:
+                    revision_index.save()
+                if quarantined:
+                    if self._sink is not None:
+                        self._sink.quarantine.extend(
+                            {'source': str(source), 'reason': reason} for source, reason in quarantined
+                        )
+                        quarantine_path = self._sink.quarantine_path
+                    else:
+                        quarantine_path = output_dir / QUARANTINE_NAME
+                        write_quarantine(quarantine_path, quarantined, append=resume)
+                    console.print(
+                        f"⚠️  Quarantined [bold]{len(quarantined)}[/bold] failed files, "
+                        f"see {quarantine_path}"
+                    )
+        
+        if duplicates:
+            write_duplicates(
+                output_dir / DUPLICATES_NAME,
+                ((source, original, key) for source, _, original, key in duplicates),
+                append=resume,
+            )
+            if self.dedup == "symlink":
+                skipped_files += self._link_duplicates(duplicates)
+        return skipped_files + converted_files
+    
+    def batch_convert(
+        self,
+        input_dir: Path,
+        output_dir: Optional[Path] = None,
+        jobs: int = 1,
+        incremental: bool = False,
+        resume: bool = False,
+    ) -> list[Path]:
+        """Convert all EML files in a directory to PDF.
+        
+        ``.eml.gz`` files and the EML members of zip and tar archives in the
+        directory are converted too, without extracting them to disk.
+        """
         if not input_dir.exists() or not input_dir.is_dir():
             raise NotADirectoryError(f"Input directory not found: {input_dir}")
         
@@ -751,28 +1798,29 @@ class EMLToPDFConverter:
         
         output_dir.mkdir(exist_ok=True)
         
-        eml_files = list(input_dir.glob("*.eml"))
-        if not eml_files:
+        # Sorted, so the copy --dedup keeps and ties between revisions do not depend on directory order
+        eml_files = sorted(path for pattern in ("*.eml", "*.eml.gz") for path in input_dir.glob(pattern))
+        archives = sorted(path for path in input_dir.glob("*") if path.is_file() and (is_indexed_archive(path) or is_tar_stream(path)))
+        if not eml_files and not archives:
             console.print(f"❌ No EML files found in {input_dir}")
             return []
         
         console.print(f"Found [bold]{len(eml_files)}[/bold] EML files to convert...")
         
-        converted_files = []
-        for eml_file in eml_files:
-            try:
-                output_file = output_dir / f"{eml_file.stem}.pdf"
-                converted_file = self.convert_eml_to_pdf(eml_file, output_file)
-                if converted_file:  # Only add if conversion was successful
-                    converted_files.append(converted_file)
-            except Exception as e:
-                console.print(f"❌ Failed to convert {eml_file.name}: {e}")
-                continue
+        tasks = [(eml_file, output_dir / pdf_path(eml_file.name)) for eml_file in eml_files]
+        converted_files = self._run_archive_batch(tasks, archives, input_dir, output_dir, jobs, incremental, resume)
         
         console.print(f"✓ Successfully converted [bold green]{len(converted_files)}[/bold green] files")
         return converted_files
     
-    def recursive_batch_convert(self, input_dir: Path, output_dir: Optional[Path] = None) -> list[Path]:
+    def recursive_batch_convert(
+        self,
+        input_dir: Path,
+        output_dir: Optional[Path] = None,
+        jobs: int = 1,
+        incremental: bool = False,
+        resume: bool = False,
+    ) -> list[Path]:
         """Recursively convert all EML files in a directory tree to PDF, creating perfect mirror structure."""
         if not input_dir.exists() or not input_dir.is_dir():
             raise NotADirectoryError(f"Input directory not found: {input_dir}")
@@ -784,17 +1832,17 @@ class EMLToPDFConverter:
         # Ensure output directory exists
         output_dir.mkdir(parents=True, exist_ok=True)
         
-        # Find all EML files recursively
-        eml_files = list(input_dir.rglob("*.eml"))
-        if not eml_files:
+        # Find all EML files (plain or gzipped) and archives recursively
+        # Sorted, so the copy --dedup keeps and ties between revisions do not depend on directory order
+        eml_files = sorted(path for pattern in ("*.eml", "*.eml.gz") for path in input_dir.rglob(pattern))
+        archives = sorted(path for path in input_dir.rglob("*") if path.is_file() and (is_indexed_archive(path) or is_tar_stream(path)))
+        if not eml_files and not archives:
             console.print(f"❌ No EML files found recursively in {input_dir}")
             return []
         
         console.print(f"Found [bold]{len(eml_files)}[/bold] EML files recursively to convert...")
         console.print(f"Creating mirror structure: {input_dir} -> {output_dir}")
         
-        converted_files = []
-        
         # First, mirror the directory structure (including empty directories)
         for root, dirs, files in input_dir.walk():
             # Calculate relative path from input_dir
@@ -805,22 +1853,305 @@ class EMLToPDFConverter:
             output_subdir.mkdir(parents=True, exist_ok=True)
         
         # Then convert all EML files while preserving structure
+        tasks = []
         for eml_file in eml_files:
-            try:
-                # Calculate relative path from input_dir to maintain structure
-                relative_path = eml_file.relative_to(input_dir)
-                
-                # Create corresponding output path with PDF extension
-                output_file = output_dir / relative_path.with_suffix('.pdf')
-                
-                converted_file = self.convert_eml_to_pdf(eml_file, output_file)
-                if converted_file:  # Only add if conversion was successful
-                    converted_files.append(converted_file)
-                
-            except Exception as e:
-                console.print(f"❌ Failed to convert {eml_file.name}: {e}")
-                continue
+            relative_path = eml_file.relative_to(input_dir)
+            tasks.append((eml_file, output_dir / relative_path.parent / pdf_path(relative_path.name)))
+        converted_files = self._run_archive_batch(tasks, archives, input_dir, output_dir, jobs, incremental, resume)
         
         console.print(f"✓ Successfully converted [bold green]{len(converted_files)}[/bold green] files recursively")
-        console.print(f"✓ Mirror structure created at: [bold green]{output_dir}[/bold green]")
-        return converted_files
\ No newline at end of file
+        if self._sink is None:
+            console.print(f"✓ Mirror structure created at: [bold green]{output_dir}[/bold green]")
+        return converted_files
+    
+    def _run_archive_batch(
+        self,
+        tasks: list[tuple[Source, Path]],
+        archives: list[Path],
+        input_dir: Path,
+        output_dir: Path,
+        jobs: int = 1,
+        incremental: bool = False,
+        resume: bool = False,
+    ) -> list[Path]:
+        """Run a directory batch, adding the members of the archives found in it.
+        
+        Members of each archive go into a folder named after the archive,
+        mirroring the archive's place under ``input_dir``.
+        """
+        tar_streams = []
+        for archive in archives:
+            relative_path = archive.relative_to(input_dir)
+            member_dir = output_dir / relative_path.parent / strip_suffixes(relative_path.name)
+            if is_tar_stream(archive):
+                tar_streams.append((archive, member_dir))
+                continue
+            members = self._archive_tasks(archive, member_dir)
+            console.print(f"Found [bold]{len(members)}[/bold] EML files in {relative_path}")
+            tasks.extend(members)
+        
+        run_tasks = chain(tasks, *(self._tar_file_tasks(archive, member_dir) for archive, member_dir in tar_streams))
+        with self._whole_run_revisions(run_tasks):
+            converted_files = self._run_batch(tasks, output_dir, jobs, incremental, resume)
+            for archive, member_dir in tar_streams:
+                # Later runs share the journal and quarantine of the first
+                with open(archive, 'rb') as f:
+                    converted_files += self.tar_stream_convert(
+                        f, member_dir, jobs, resume=True, origin=str(archive.resolve()), state_dir=output_dir
+                    )
+        return converted_files
+    
+    @staticmethod
+    def _tar_file_tasks(archive: Path, output_dir: Path) -> Iterator[tuple[Source, Path]]:
+        """Batch tasks for the EML members of a compressed tar file, read front to back."""
+        with open(archive, 'rb') as f:
+            for message in iter_tar_stream(f, str(archive.resolve())):
+                yield message, output_dir / pdf_path(message.member)
+    
+    def _archive_tasks(self, archive: Path, member_dir: Path) -> list[tuple[Source, Path]]:
+        """Batch tasks for the EML members of a zip or uncompressed tar archive."""
+        tasks = []
+        for member in iter_archive(archive):
+            output_file = member_dir / pdf_path(member.member)
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+            tasks.append((member, output_file))
+        return tasks
+    
+    def archive_convert(
+        self,
+        archive: Path,
+        output_dir: Optional[Path] = None,
+        jobs: int = 1,
+        resume: bool = False,
+        incremental: bool = False,
+    ) -> list[Path]:
+        """Convert the EML members of a zip or tar archive without extracting it.
+        
+        Zip and uncompressed tar archives are indexed up front and each worker
+        reads and decompresses its own members. Compressed tar archives can
+        only be read front to back, so they are streamed (see
+        ``tar_stream_convert``), and ``incremental`` does not apply to them.
+        """
+        if not archive.is_file():
+            raise FileNotFoundError(f"Archive not found: {archive}")
+        
+        if output_dir is None:
+            output_dir = archive.parent / f"{strip_suffixes(archive.name)}_pdfs"
+        
+        output_dir.mkdir(parents=True, exist_ok=True)
+        
+        if is_tar_stream(archive):
+            with self._whole_run_revisions(self._tar_file_tasks(archive, output_dir)):
+                with open(archive, 'rb') as f:
+                    return self.tar_stream_convert(f, output_dir, jobs, resume=resume, origin=str(archive.resolve()))
+        
+        tasks = self._archive_tasks(archive, output_dir)
+        if not tasks:
+            console.print(f"❌ No EML files found in {archive}")
+            return []
+        
+        console.print(f"Found [bold]{len(tasks)}[/bold] EML files in {archive.name} to convert...")
+        converted_files = self._run_batch(tasks, output_dir, jobs, incremental, resume)
+        
+        console.print(f"✓ Successfully converted [bold green]{len(converted_files)}[/bold green] files")
+        return converted_files
+    
+    def tar_stream_convert(
+        self,
+        fileobj: BinaryIO,
+        output_dir: Path,
+        jobs: int = 1,
+        resume: bool = False,
+        origin: str = "stdin",
+        state_dir: Optional[Path] = None,
+    ) -> list[Path]:
+        """Convert the EML members of a tar stream, such as a ``.tar.gz`` or stdin.
+        
+        The stream is read front to back and members are converted in groups
+        of ``TAR_STREAM_GROUP_SIZE`` per worker, so memory stays bounded by one
+        group however large the archive is. The journal and quarantine live in
+        ``state_dir`` (defaults to ``output_dir``). With ``latest_only``, the
+        whole stream must have been scanned for revisions first, which
+        ``archive_convert`` does for tar files; a pipe cannot be read twice.
+        """
+        if self.latest_only and self._revision_scan is None:
+            raise ValueError("latest_only needs to read the whole tar stream up front; convert a tar file instead")
+        output_dir.mkdir(parents=True, exist_ok=True)
+        state_dir = state_dir or output_dir
+        group_size = TAR_STREAM_GROUP_SIZE * (jobs if jobs > 0 else os.cpu_count() or 1)
+        
+        converted_files = []
+        group = []
+        for message in iter_tar_stream(fileobj, origin):
+            output_file = output_dir / pdf_path(message.member)
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+            group.append((message, output_file))
+            if len(group) >= group_size:
+                converted_files += self._run_batch(group, state_dir, jobs, resume=resume)
+                # Later groups extend this run's journal and quarantine
+                resume = True
+                group = []
+        if group:
+            converted_files += self._run_batch(group, state_dir, jobs, resume=resume)
+        
+        console.print(f"✓ Successfully converted [bold green]{len(converted_files)}[/bold green] files from {origin}")
+        return converted_files
+    
+    def mbox_convert(
+        self,
+        mbox_path: Path,
+        output_dir: Optional[Path] = None,
+        jobs: int = 1,
+        resume: bool = False,
+    ) -> list[Path]:
+        """Convert every message of an mbox file to PDF, without splitting the file.
+        
+        Messages are located through a byte-offset index built by scanning a
+        memory map of the archive, and each worker parses only its own byte
+        ranges. PDFs are named after each message's Message-ID, or its
+        sequence number when it has none.
+        """
+        if not mbox_path.is_file():
+            raise FileNotFoundError(f"mbox file not found: {mbox_path}")
+        
+        if output_dir is None:
+            output_dir = mbox_path.parent / f"{mbox_path.stem}_pdfs"
+        
+        output_dir.mkdir(parents=True, exist_ok=True)
+        
+        messages = list(iter_mbox(mbox_path))
+        if not messages:
+            console.print(f"❌ No messages found in {mbox_path}")
+            return []
+        
+        console.print(f"Found [bold]{len(messages)}[/bold] messages in {mbox_path.name} to convert...")
+        
+        tasks = []
+        used_names = set()
+        for message in messages:
+            name = message.output_name()
+            if name in used_names:
+                # Duplicate Message-ID: keep both, told apart by sequence number
+                name = f"{name}-{message.index:06d}"
+            used_names.add(name)
+            tasks.append((message, output_dir / f"{name}.pdf"))
+        converted_files = self._run_batch(tasks, output_dir, jobs, resume=resume)
+        
+        console.print(f"✓ Successfully converted [bold green]{len(converted_files)}[/bold green] messages")
+        return converted_files
+    
+    def extract_records(
+        self,
+        input_dir: Path,
+        target: Union[Path, TextIO],
+        format: str = "jsonl",
+        jobs: int = 1,
+        recursive: bool = True,
+    ) -> int:
+        """Extract the booking of every EML file under ``input_dir`` without rendering any PDF.
+        
+        Records are written to ``target`` in input order as they are
+        extracted (see ``output_records``); returns the number of emails
+        extracted. Only MIME decoding and the booking and flight parsers
+        run, spread over ``jobs`` worker processes.
+        """
+        with tempfile.TemporaryDirectory(prefix="eml-to-pdf-") as state_dir, \
+                self.output_records(target, format) as sink:
+            if recursive:
+                self.recursive_batch_convert(input_dir, Path(state_dir), jobs)
+            else:
+                self.batch_convert(input_dir, Path(state_dir), jobs)
+            return sink.count
+    
+    def records_convert(
+        self,
+        records_path: Path,
+        output_dir: Optional[Path] = None,
+        jobs: int = 1,
+        resume: bool = False,
+    ) -> list[Path]:
+        """Render PDFs from a record file written by an extracting batch.
+        
+        Records already hold the parsed booking and flights, so no email is
+        decoded or matched against the flight patterns again: only the HTML
+        templates and WeasyPrint run. PDFs get the relative paths the
+        original batch would have given them.
+        """
+        if not records_path.is_file():
+            raise FileNotFoundError(f"Record file not found: {records_path}")
+        if self._subject_re is not None:
+            raise ValueError("Records keep no Subject header; filter by subject when extracting instead")
+        
+        if output_dir is None:
+            output_dir = records_path.parent / f"{records_path.stem}_pdfs"
+        
+        output_dir.mkdir(parents=True, exist_ok=True)
+        
+        tasks = [(line, output_dir / safe_path(name)) for line, name in iter_record_lines(records_path)]
+        if not tasks:
+            console.print(f"❌ No records found in {records_path}")
+            return []
+        
+        console.print(f"Found [bold]{len(tasks)}[/bold] records in {records_path.name} to render...")
+        
+        for output_subdir in {output_file.parent for _, output_file in tasks}:
+            output_subdir.mkdir(parents=True, exist_ok=True)
+        converted_files = self._run_batch(tasks, output_dir, jobs, resume=resume)
+        
+        console.print(f"✓ Successfully rendered [bold green]{len(converted_files)}[/bold green] records")
+        return converted_files
+    
+    def maildir_convert(
+        self,
+        maildir_path: Path,
+        output_dir: Optional[Path] = None,
+        jobs: int = 1,
+        resume: bool = False,
+    ) -> list[Path]:
+        """Convert the messages of a Maildir that arrived since the last run.
+        
+        A cursor in the output directory records every message already
+        converted, keyed by its Maildir unique name, so only new messages are
+        parsed, and messages that failed are retried on the next run.
+        Messages the subject filter rejected are recorded too, and pre-scanned
+        again only once the filter changes.
+        Returns the newly converted PDFs.
+        """
+        if not maildir_path.is_dir():
+            raise NotADirectoryError(f"Maildir not found: {maildir_path}")
+        
+        if output_dir is None:
+            output_dir = maildir_path / "converted_pdfs"
+        
+        output_dir.mkdir(parents=True, exist_ok=True)
+        
+        messages = list_maildir(maildir_path)
+        cursor = MaildirCursor.load(output_dir, maildir_path, self.subject_filter)
+        cursor.prune(messages)
+        new_messages = {key: path for key, path in messages.items() if key not in cursor}
+        if not new_messages:
+            cursor.save()
+            console.print(f"No new messages in {maildir_path} ({len(messages)} already processed)")
+            return []
+        
+        console.print(
+            f"Found [bold]{len(new_messages)}[/bold] new messages to convert "
+            f"({len(messages) - len(new_messages)} already processed)..."
+        )
+        
+        tasks = [(path, output_dir / f"{output_name(key)}.pdf") for key, path in sorted(new_messages.items())]
+        keys = {path: key for key, path in new_messages.items()}
+        try:
+            converted_files = self._run_batch(
+                tasks, output_dir, jobs, resume=resume,
+                on_converted=lambda source, pdf: cursor.record(keys[source]),
+                # Duplicates and superseded revisions are done with too; the seen set
+                # and revision index remember what they were skipped for
+                on_skipped=lambda source: cursor.record(keys[source]),
+                on_filtered=lambda source: cursor.record_filtered(keys[source]),
+            )
+        finally:
+            cursor.save()
+        
+        console.print(f"✓ Successfully converted [bold green]{len(converted_files)}[/bold green] messages")
+        return converted_files
@@ -0,0 +1,124 @@
+"""Duplicate detection across a batch and across runs, by Message-ID or body hash."""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from .archives import read_gzip
+from .mapped import mapped_file, mapped_range
+from .mbox import MboxMessage
+from .prescan import header_text, read_headers
+
+SEEN_NAME = ".eml-to-pdf-seen"
+DUPLICATES_NAME = "duplicates.jsonl"
+DEDUP_MODES = ("report", "symlink")
+
+
+def message_key(source: Any) -> Optional[str]:
+    """Identity of an email for deduplication: its Message-ID, else a hash of its body.
+
+    The body is everything after the header block, so copies of a message
+    whose headers differ only in delivery details (Received, X-* and the
+    like) still match. Returns None for sources that are not emails.
+    """
+    if isinstance(source, MboxMessage):
+        message_id = source.message_id
+    elif isinstance(source, Path):
+        message_id = header_text(read_headers(source), 'Message-ID')
+    elif hasattr(source, 'read_headers'):
+        message_id = header_text(source.read_headers(), 'Message-ID')
+    else:
+        return None
+    message_id = message_id.strip().strip('<>').strip()
+    if message_id:
+        return f"message-id:{message_id}"
+    return f"body:{_body_digest(source)}"
+
+
+def _body_digest(source: Any) -> str:
+    if isinstance(source, MboxMessage):
+        with mapped_range(source.path, source.start, source.end) as buffer:
+            return _hash_body(buffer)
+    if isinstance(source, Path):
+        if source.suffix.lower() == '.gz':
+            return _hash_body(read_gzip(source))
+        with mapped_file(source) as buffer:
+            return _hash_body(buffer)
+    return _hash_body(source.read_bytes())
+
+
+def _hash_body(buffer) -> str:
+    view = memoryview(buffer)
+    try:
+        data = bytes(view[:min(len(view), 1 << 20)])
+        ends = [index + len(blank) for blank in (b'\r\n\r\n', b'\n\n') if (index := data.find(blank)) >= 0]
+        start = min(ends) if ends else 0
+        return hashlib.sha256(view[start:]).hexdigest()
+    finally:
+        view.release()
+
+
+class SeenSet:
+    """Messages already converted into an output directory, and the PDF each became.
+
+    Stored as one line per message: a 128-bit digest of its key and the PDF's
+    path relative to the output directory. The file is only ever appended
+    to, so a run that dies part way loses at most its unwritten lines.
+    """
+
+    def __init__(self, path: Path, entries: Optional[Dict[str, str]] = None):
+        self.path = path
+        self.entries = entries if entries is not None else {}
+        self._new: Dict[str, str] = {}
+
+    @classmethod
+    def load(cls, output_dir: Path) -> "SeenSet":
+        path = output_dir / SEEN_NAME
+        entries = {}
+        try:
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    digest, sep, name = line.rstrip('\n').partition('\t')
+                    if sep and len(digest) == 32:
+                        entries[digest] = name
+        except FileNotFoundError:
+            pass
+        return cls(path, entries)
+
+    @staticmethod
+    def digest(key: str) -> str:
+        return hashlib.sha256(key.encode('utf-8', 'surrogateescape')).hexdigest()[:32]
+
+    def get(self, key: str) -> Optional[str]:
+        """Relative path of the PDF rendered for ``key`` by any run, or None."""
+        return self.entries.get(self.digest(key))
+
+    def add(self, key: str, name: str) -> None:
+        digest = self.digest(key)
+        if self.entries.get(digest) != name:
+            self.entries[digest] = name
+            self._new[digest] = name
+
+    def save(self) -> None:
+        """Append the messages added since loading."""
+        if not self._new:
+            return
+        with open(self.path, 'a+', encoding='utf-8') as f:
+            if f.tell() > 0:
+                # Terminate a torn final line so it cannot swallow the next entry
+                f.seek(f.tell() - 1)
+                if f.read(1) != '\n':
+                    f.write('\n')
+            f.writelines(f"{digest}\t{name}\n" for digest, name in self._new.items())
+            f.flush()
+            os.fsync(f.fileno())
+        self._new = {}
+
+
+def write_duplicates(path: Path, duplicates: Iterable[tuple[Any, Path, str]], append: bool = False) -> None:
+    """Write one JSON line per skipped duplicate, naming the PDF it duplicates."""
+    with open(path, 'a' if append else 'w', encoding='utf-8') as f:
+        for source, original, key in duplicates:
+            f.write(json.dumps({'source': str(source), 'duplicate_of': str(original), 'key': key}) + '\n')
@@ -0,0 +1,95 @@
+"""Append-only journal of finished batch files, used to resume interrupted runs."""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, Iterable
+
+JOURNAL_NAME = ".eml-to-pdf-journal.jsonl"
+QUARANTINE_NAME = "quarantine.jsonl"
+
+
+def write_quarantine(path: Path, failures: Iterable[tuple[Path, str]], append: bool = False) -> None:
+    """Write one JSON line per failed source with the reason it failed."""
+    with open(path, 'a' if append else 'w', encoding='utf-8') as f:
+        for source, reason in failures:
+            f.write(json.dumps({'source': str(source), 'reason': reason}) + '\n')
+
+
+class Journal:
+    """Crash-safe record of every file a batch has finished, one JSON line each.
+
+    Entries are buffered and written in groups, each group followed by an
+    fsync, so the journal costs one disk flush per ``flush_every`` files (or
+    per ``flush_interval`` seconds) rather than one per file. After a crash at
+    most the last unflushed group is lost, and those files are simply
+    converted again on resume. A torn final line is ignored when reading.
+    """
+
+    def __init__(self, path: Path, append: bool = False, flush_every: int = 64, flush_interval: float = 1.0):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._buffer: list[str] = []
+        self._last_flush = time.monotonic()
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8')
+        if append and self._file.tell() > 0:
+            # Terminate a torn final line so it cannot swallow the next entry
+            with open(path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    self._buffer.append('\n')
+
+    @staticmethod
+    def read(path: Path) -> Dict[str, Dict[str, Any]]:
+        """Return the journal entries in ``path`` keyed by source path."""
+        entries = {}
+        try:
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Torn write from a crash
+                    entries[entry['source']] = entry
+        except FileNotFoundError:
+            pass
+        return entries
+
+    @staticmethod
+    def key(source: Any) -> str:
+        if isinstance(source, Path):
+            return str(source.resolve())
+        # Messages inside an archive carry their own stable key
+        return source.key()
+
+    def record(self, source: Any, output: Optional[Path], error: Optional[str] = None) -> None:
+        """Record that ``source`` finished, either as ``output`` or with ``error``."""
+        entry = {'source': self.key(source), 'status': 'failed' if error is not None or not output else 'ok'}
+        if output:
+            entry['output'] = str(output)
+        if error is not None:
+            entry['error'] = error
+        self._buffer.append(json.dumps(entry) + '\n')
+        if len(self._buffer) >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered entries and fsync them to disk."""
+        if self._buffer:
+            self._file.write(''.join(self._buffer))
+            self._buffer.clear()
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        self.flush()
+        self._file.close()
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,125 @@
+"""Maildir input, with a persisted cursor so repeated runs only see new mail."""
+
+import json
+import mailbox
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+CURSOR_NAME = ".eml-to-pdf-maildir-cursor.json"
+CURSOR_VERSION = 1
+
+_UNSAFE_NAME_RE = re.compile(r'[^A-Za-z0-9._@+-]+')
+
+
+def is_maildir(path: Path) -> bool:
+    """Whether ``path`` is a Maildir, i.e. has ``cur``, ``new`` and ``tmp`` subdirectories."""
+    return all((path / sub).is_dir() for sub in ('cur', 'new', 'tmp'))
+
+
+def list_maildir(path: Path) -> Dict[str, Path]:
+    """Map the key of every delivered message in a Maildir to its current file.
+
+    Keys are the unique names before the info suffix (":2,S" and the like),
+    so they stay the same when a mail client moves a message from ``new`` to
+    ``cur`` or changes its flags. This is the listing ``mailbox.Maildir``
+    does, but it keeps the file paths so workers can open messages directly.
+    """
+    messages = {}
+    for sub in ('new', 'cur'):
+        with os.scandir(path / sub) as entries:
+            for entry in entries:
+                if entry.name.startswith('.') or not entry.is_file():
+                    continue
+                key = entry.name.split(mailbox.Maildir.colon)[0]
+                messages[key] = Path(entry.path)
+    return messages
+
+
+def output_name(key: str) -> str:
+    """File name stem for the PDF of the message with Maildir ``key``."""
+    return _UNSAFE_NAME_RE.sub('_', key).strip('._') or "message"
+
+
+class MaildirCursor:
+    """Keys of the Maildir messages already converted into an output directory.
+
+    Saved next to the PDFs, so a run every minute against a live mailbox only
+    converts messages that arrived (or previously failed) since the last run.
+    Messages the subject filter rejected are kept apart, together with the
+    filter, so they are not pre-scanned again while it is unchanged and are
+    looked at afresh once it changes. Keys of messages that have since been
+    deleted are pruned.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        maildir: str,
+        keys: Iterable[str] = (),
+        subject_filter: Optional[str] = None,
+        filtered: Iterable[str] = (),
+    ):
+        self.path = path
+        self.maildir = maildir
+        self.keys = set(keys)
+        self.subject_filter = subject_filter
+        self.filtered = set(filtered)
+        self._dirty = False
+
+    @classmethod
+    def load(cls, output_dir: Path, maildir: Path, subject_filter: Optional[str] = None) -> "MaildirCursor":
+        """Load the cursor in ``output_dir``, or start a new one if it tracks another Maildir."""
+        path = output_dir / CURSOR_NAME
+        source = str(maildir.resolve())
+        keys = []
+        filtered = []
+        try:
+            data = json.loads(path.read_text())
+            if data.get('version') == CURSOR_VERSION and data.get('maildir') == source:
+                keys = data['keys']
+                if data.get('subject_filter') == subject_filter:
+                    filtered = data.get('filtered', [])
+        except (OSError, ValueError, KeyError):
+            pass
+        return cls(path, source, keys, subject_filter, filtered)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.keys or key in self.filtered
+
+    def record(self, key: str) -> None:
+        self.keys.add(key)
+        self._dirty = True
+
+    def record_filtered(self, key: str) -> None:
+        """Remember a message the subject filter rejected."""
+        self.filtered.add(key)
+        self._dirty = True
+
+    def prune(self, present: Iterable[str]) -> None:
+        """Forget keys of messages no longer in the Maildir."""
+        kept = self.keys.intersection(present)
+        kept_filtered = self.filtered.intersection(present)
+        if len(kept) < len(self.keys) or len(kept_filtered) < len(self.filtered):
+            self.keys = kept
+            self.filtered = kept_filtered
+            self._dirty = True
+
+    def save(self) -> None:
+        """Atomically write the cursor back if anything changed."""
+        if not self._dirty:
+            return
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(
+            {
+                'version': CURSOR_VERSION,
+                'maildir': self.maildir,
+                'keys': sorted(self.keys),
+                'subject_filter': self.subject_filter,
+                'filtered': sorted(self.filtered),
+            },
+            separators=(',', ':'),
+        ))
+        os.replace(tmp_path, self.path)
+        self._dirty = False
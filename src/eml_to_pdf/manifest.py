@@ -0,0 +1,125 @@
+"""Manifest of converted files, used to skip unchanged inputs in incremental batches."""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Optional, Dict, Any, Union
+
+from .archives import ArchiveMember
+
+MANIFEST_NAME = ".eml-to-pdf-manifest.json"
+MANIFEST_VERSION = 1
+
+
+def file_digest(path: Path) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Manifest:
+    """Record of every source converted into an output directory.
+
+    Each entry stores the source size, mtime, content hash and the parser
+    version and template hash it was rendered with. A source is current when
+    its PDF still exists, it was rendered by the same parser and template, and
+    either its size and mtime are unchanged or its content hash still matches.
+    Only sources whose size and mtime changed are re-hashed, so checking an
+    unchanged archive costs one stat per file.
+
+    Members of zip and uncompressed tar archives are keyed by archive path
+    and member name, and stand on the size and mtime of their archive: while
+    it is unchanged so are they, and once it changes each member is re-hashed
+    and only those whose content changed are re-rendered.
+    """
+
+    def __init__(self, path: Path, parser_version: str, template_hash: str,
+                 entries: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.path = path
+        self.parser_version = parser_version
+        self.template_hash = template_hash
+        self.entries = entries if entries is not None else {}
+        self._dirty = False
+
+    @classmethod
+    def load(cls, output_dir: Path, parser_version: str, template_hash: str) -> "Manifest":
+        """Load the manifest stored in ``output_dir``, or start an empty one."""
+        path = output_dir / MANIFEST_NAME
+        entries = {}
+        try:
+            data = json.loads(path.read_text())
+            if data.get('version') == MANIFEST_VERSION:
+                entries = data['files']
+        except (OSError, ValueError, KeyError):
+            pass
+        return cls(path, parser_version, template_hash, entries)
+
+    @staticmethod
+    def key(source: Union[Path, ArchiveMember]) -> str:
+        if isinstance(source, ArchiveMember):
+            return source.key()
+        return str(source.resolve())
+
+    @staticmethod
+    def _stat(source: Union[Path, ArchiveMember]) -> os.stat_result:
+        return (source.archive if isinstance(source, ArchiveMember) else source).stat()
+
+    @staticmethod
+    def _digest(source: Union[Path, ArchiveMember]) -> str:
+        if isinstance(source, ArchiveMember):
+            return hashlib.sha256(source.read_bytes()).hexdigest()
+        return file_digest(source)
+
+    def is_current(self, source: Union[Path, ArchiveMember], output: Path) -> bool:
+        """Whether ``output`` is an up-to-date rendering of ``source``."""
+        entry = self.entries.get(self.key(source))
+        if (entry is None
+                or entry['parser_version'] != self.parser_version
+                or entry['template_hash'] != self.template_hash
+                or entry['output'] != str(output)
+                or not output.exists()):
+            return False
+
+        stat = self._stat(source)
+        if stat.st_size == entry['size'] and stat.st_mtime_ns == entry['mtime_ns']:
+            return True
+        if stat.st_size != entry['size'] and not isinstance(source, ArchiveMember):
+            return False
+
+        # Touched but possibly unchanged (or another member of its archive
+        # changed): fall back to the content hash
+        if self._digest(source) != entry['sha256']:
+            return False
+        entry['size'] = stat.st_size
+        entry['mtime_ns'] = stat.st_mtime_ns
+        self._dirty = True
+        return True
+
+    def record(self, source: Union[Path, ArchiveMember], output: Path) -> None:
+        """Record a successful conversion of ``source`` into ``output``."""
+        stat = self._stat(source)
+        self.entries[self.key(source)] = {
+            'output': str(output),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': self._digest(source),
+            'parser_version': self.parser_version,
+            'template_hash': self.template_hash,
+        }
+        self._dirty = True
+
+    def save(self) -> None:
+        """Atomically write the manifest back if anything changed."""
+        if not self._dirty:
+            return
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(
+            {'version': MANIFEST_VERSION, 'files': self.entries},
+            separators=(',', ':'),
+        ))
+        os.replace(tmp_path, self.path)
+        self._dirty = False
@@ -0,0 +1,86 @@
+"""Memory-mapped reading of input files, so large messages are not copied into bytes first."""
+
+import email.message
+import io
+import mmap
+from contextlib import contextmanager
+from email.parser import Parser
+from pathlib import Path
+from typing import BinaryIO, Iterator, Union
+
+Buffer = Union[bytes, mmap.mmap, memoryview]
+
+
+@contextmanager
+def mapped_file(path: Path) -> Iterator[Buffer]:
+    """Map ``path`` read-only for the duration of the block.
+
+    Pages are loaded from the page cache on demand and never copied into a
+    Python ``bytes`` object. Empty files, which cannot be mapped, yield b''.
+    """
+    with open(path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            yield b''
+            return
+        with mm:
+            yield mm
+
+
+def message_from_buffer(buffer: Buffer) -> email.message.Message:
+    """Parse a message straight from a bytes-like buffer such as an mmap.
+
+    Equivalent to ``email.message_from_bytes``, which decodes its input as
+    ASCII with surrogateescape before parsing; doing that decode directly on
+    the buffer skips the intermediate ``bytes`` copy.
+    """
+    return Parser().parsestr(str(buffer, 'ascii', 'surrogateescape'))
+
+
+@contextmanager
+def mapped_range(path: Path, start: int, end: int) -> Iterator[Buffer]:
+    """Map ``path`` and yield a zero-copy view of bytes ``start`` to ``end``."""
+    with mapped_file(path) as buffer:
+        with memoryview(buffer) as whole, whole[start:end] as view:
+            yield view
+
+
+class _ViewReader(io.RawIOBase):
+    """Seekable raw stream over a memoryview, for wrapping in a BufferedReader."""
+
+    def __init__(self, view: memoryview):
+        self._view = view
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        count = max(0, min(len(buffer), len(self._view) - self._position))
+        buffer[:count] = self._view[self._position:self._position + count]
+        self._position += count
+        return count
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: len(self._view)}[whence]
+        self._position = max(0, base + offset)
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+
+@contextmanager
+def open_range(path: Path, start: int, end: int) -> Iterator[BinaryIO]:
+    """Open bytes ``start`` to ``end`` of ``path`` as a buffered binary file, without copying them."""
+    with mapped_range(path, start, end) as view:
+        reader = io.BufferedReader(_ViewReader(view))
+        try:
+            yield reader
+        finally:
+            # Drop the reader's hold on the view before the mapping closes
+            reader.detach()._view = None
@@ -0,0 +1,100 @@
+"""Streaming access to mbox archives through a byte-offset index."""
+
+import email.message
+import re
+from dataclasses import dataclass
+from email.parser import BytesHeaderParser
+from pathlib import Path
+from typing import Iterator
+
+from .mapped import mapped_file, mapped_range
+from .prescan import MAX_HEADER_BYTES
+
+MBOX_SUFFIXES = ('.mbox', '.mbx')
+
+_UNSAFE_NAME_RE = re.compile(r'[^A-Za-z0-9._@+-]+')
+
+
+@dataclass(frozen=True)
+class MboxMessage:
+    """One message of an mbox file, located by its byte range.
+
+    Only the offsets are kept, so an index of a multi-GB archive stays small,
+    and workers can each map and parse their own disjoint ranges.
+    """
+    path: Path
+    index: int
+    start: int
+    end: int
+    message_id: str = ""
+
+    @property
+    def name(self) -> str:
+        return f"{self.path.name}#{self.index}"
+
+    def __str__(self) -> str:
+        return f"{self.path}#{self.index}"
+
+    def key(self) -> str:
+        """Stable identity for journals; offsets do not move when mail is appended."""
+        return f"{self.path.resolve()}@{self.start}"
+
+    def read_headers(self) -> email.message.Message:
+        """Parse just the header block of this message."""
+        with mapped_range(self.path, self.start, self.end) as view:
+            return _parse_headers(view, 0, len(view))
+
+    def output_name(self) -> str:
+        """File name stem for this message's PDF: its Message-ID, or its sequence number."""
+        stem = _UNSAFE_NAME_RE.sub('_', self.message_id.strip().strip('<>')).strip('._')[:100]
+        return stem or f"message-{self.index:06d}"
+
+
+def is_mbox(path: Path) -> bool:
+    """Whether ``path`` looks like an mbox file, by extension or its leading "From " line."""
+    if path.suffix.lower() in MBOX_SUFFIXES:
+        return True
+    try:
+        with open(path, 'rb') as f:
+            return f.read(5) == b'From '
+    except OSError:
+        return False
+
+
+def iter_mbox(path: Path) -> Iterator[MboxMessage]:
+    """Yield every message in an mbox file, in order, without loading the file.
+
+    The file is memory-mapped and scanned for "From " separator lines, as
+    ``mailbox.mbox`` does; each message spans the bytes after its separator
+    up to the next one, minus the blank line that precedes it.
+    """
+    with mapped_file(path) as buffer:
+        size = len(buffer)
+        separator = 0 if buffer[:5] == b'From ' else _next_separator(buffer, 0)
+        index = 0
+        while separator >= 0:
+            line_end = buffer.find(b'\n', separator)
+            start = line_end + 1 if line_end >= 0 else size
+            following = _next_separator(buffer, start)
+            end = size if following < 0 else following
+            if end - 2 >= start and buffer[end - 2:end] == b'\n\n':
+                end -= 1
+            index += 1
+            message_id = _parse_headers(buffer, start, end).get('Message-ID')
+            yield MboxMessage(path, index, start, end, str(message_id) if message_id is not None else "")
+            separator = following
+
+
+def _parse_headers(buffer, start: int, end: int) -> email.message.Message:
+    """Parse the header block of the message in ``buffer[start:end]``."""
+    data = bytes(buffer[start:min(end, start + MAX_HEADER_BYTES)])
+    header_end = data.find(b'\n\n')
+    if header_end >= 0:
+        data = data[:header_end + 1]
+    return BytesHeaderParser().parsebytes(data)
+
+
+def _next_separator(buffer, position: int) -> int:
+    """Offset of the next line at or after ``position`` that starts with "From ", or -1."""
+    index = buffer.find(b'\nFrom ', max(position - 1, 0))
+    return index + 1 if index >= 0 else -1
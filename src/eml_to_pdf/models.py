@@ -0,0 +1,41 @@
+"""Data models for the booking and flight details parsed from an email."""
+
+from dataclasses import dataclass
+from typing import List
+
+
+@dataclass
+class FlightInfo:
+    """Data class for flight information."""
+    flight_number: str = ""
+    airline: str = ""
+    departure_city: str = ""
+    departure_airport: str = ""
+    departure_date: str = ""
+    departure_time: str = ""
+    arrival_city: str = ""
+    arrival_airport: str = ""
+    arrival_date: str = ""
+    arrival_time: str = ""
+    duration: str = ""
+    aircraft: str = ""
+    booking_ref: str = ""
+    class_type: str = ""
+    meal: str = ""
+    baggage: str = ""
+
+
+@dataclass
+class BookingInfo:
+    """Data class for booking information."""
+    passenger_name: str = ""
+    booking_ref: str = ""
+    date: str = ""
+    group: str = ""
+    ticket_number: str = ""
+    flights: List[FlightInfo] = None
+    co2_kg: str = ""
+    
+    def __post_init__(self):
+        if self.flights is None:
+            self.flights = []
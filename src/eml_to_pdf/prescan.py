@@ -0,0 +1,43 @@
+"""Header-only pre-scan of EML files, used to filter batches before full parsing."""
+
+import email.message
+import gzip
+from email.header import decode_header, make_header
+from email.parser import BytesParser
+from pathlib import Path
+
+# Headers are normally a few KB; stop reading malformed files long before their body
+MAX_HEADER_BYTES = 256 * 1024
+
+
+def read_headers(path: Path) -> email.message.Message:
+    """Parse just the header block of an EML file, leaving its body unread.
+
+    Only the bytes up to the first blank line are read from disk (or
+    decompressed, for ``.gz`` files), so the cost is independent of the size
+    of the body and attachments.
+    """
+    lines = []
+    size = 0
+    opener = gzip.open if path.suffix.lower() == '.gz' else open
+    with opener(path, 'rb') as f:
+        for line in f:
+            if line in (b'\n', b'\r\n'):
+                break
+            lines.append(line)
+            size += len(line)
+            if size >= MAX_HEADER_BYTES:
+                break
+    return BytesParser().parsebytes(b''.join(lines), headersonly=True)
+
+
+def header_text(headers: email.message.Message, name: str) -> str:
+    """Return a header with RFC 2047 encoded words decoded, or "" if missing."""
+    value = headers.get(name)
+    if value is None:
+        return ""
+    try:
+        return str(make_header(decode_header(str(value))))
+    except (ValueError, LookupError):
+        # Malformed encoded word or unknown charset: keep the raw value
+        return str(value)
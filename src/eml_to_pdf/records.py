@@ -0,0 +1,180 @@
+"""Versioned JSON records of extracted bookings, the intermediate between extracting and rendering."""
+
+import csv
+import json
+import os
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Union
+
+from .models import BookingInfo, FlightInfo
+
+# Bump when the record layout changes incompatibly
+RECORD_VERSION = 1
+RECORD_SUFFIXES = ('.jsonl',)
+RECORD_FORMATS = ("jsonl", "csv")
+
+# CSV has one row per flight, repeating the booking columns; a flight's own
+# booking_ref column is renamed to keep column names unique
+BOOKING_COLUMNS = [field.name for field in fields(BookingInfo) if field.name != 'flights']
+FLIGHT_COLUMNS = [field.name for field in fields(FlightInfo)]
+CSV_COLUMNS = (
+    ['source', 'name'] + BOOKING_COLUMNS + ['flight_index']
+    + ['flight_' + name if name in BOOKING_COLUMNS else name for name in FLIGHT_COLUMNS] + ['error']
+)
+
+
+def is_record_file(path: Path) -> bool:
+    """Whether ``path`` is a record file that can be rendered from."""
+    return path.name.lower().endswith(RECORD_SUFFIXES)
+
+
+def record_format(path: Path) -> Optional[str]:
+    """The record format implied by an output file's extension, if any."""
+    suffix = path.suffix.lower().lstrip('.')
+    return suffix if suffix in RECORD_FORMATS else None
+
+
+def booking_record(booking: BookingInfo, source: str, name: str, parser: str) -> Dict[str, Any]:
+    """The record for ``booking``, extracted from ``source`` and rendered as ``name``."""
+    return {'v': RECORD_VERSION, 'parser': parser, 'source': source, 'name': name, 'booking': asdict(booking)}
+
+
+def booking_from_record(record: Dict[str, Any]) -> BookingInfo:
+    """Rebuild the booking in a record, ignoring fields this version does not know."""
+    if record.get('v') != RECORD_VERSION:
+        raise ValueError(f"unsupported record version {record.get('v')!r}, expected {RECORD_VERSION}")
+    data = dict(record['booking'])
+    flights = [_known_fields(FlightInfo, flight) for flight in data.pop('flights', None) or []]
+    booking = _known_fields(BookingInfo, data)
+    booking.flights = flights
+    return booking
+
+
+def _known_fields(cls, data: Dict[str, Any]):
+    names = {field.name for field in fields(cls)}
+    return cls(**{key: value for key, value in data.items() if key in names})
+
+
+def csv_rows(record: Dict[str, Any]) -> Iterator[list]:
+    """CSV rows for a record: one per flight, or a single row without flight columns."""
+    booking = record.get('booking') or {}
+    head = [record.get('source', ''), record.get('name', '')] + [booking.get(name, '') for name in BOOKING_COLUMNS]
+    error = record.get('error', '')
+    flights = booking.get('flights') or []
+    if not flights:
+        yield head + [''] * (1 + len(FLIGHT_COLUMNS)) + [error]
+    for index, flight in enumerate(flights, 1):
+        yield head + [index] + [flight.get(name, '') for name in FLIGHT_COLUMNS] + [error]
+
+
+@dataclass(frozen=True)
+class RecordEntry:
+    """Where a task's record goes in the output record file; ``name`` is its PDF's relative path."""
+    name: str
+
+
+@dataclass(frozen=True)
+class RecordLine:
+    """One record of a record file, kept as its JSON text until a worker renders it."""
+    path: Path
+    index: int
+    line: str
+
+    @property
+    def name(self) -> str:
+        return f"{self.path.name}#{self.index}"
+
+    def __str__(self) -> str:
+        return f"{self.path}#{self.index}"
+
+    def key(self) -> str:
+        return f"{self.path.resolve()}#{self.index}"
+
+    def record(self) -> Dict[str, Any]:
+        return json.loads(self.line)
+
+
+def iter_record_lines(path: Path) -> Iterator[tuple[RecordLine, str]]:
+    """Yield each record of a record file with the relative PDF path it names.
+
+    Records that carry an ``error`` instead of a booking (emails that failed
+    to extract) are skipped.
+    """
+    with open(path, encoding='utf-8') as f:
+        for index, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if 'booking' in record:
+                yield RecordLine(path, index, line), record['name']
+
+
+class RecordSink:
+    """Writes each extracted email as a JSON line (or CSV rows) as results arrive.
+
+    Like ``ArchiveSink``, only the batch's parent process writes. A file
+    target is built under a temporary name and renamed into place on close;
+    a stream target such as stdout receives records as they are extracted.
+    Failed emails are written as ``{"v", "source", "error"}`` records (or
+    rows with an ``error`` column) at the end.
+    """
+
+    def __init__(self, target: Union[Path, TextIO], format: str = "jsonl"):
+        if format not in RECORD_FORMATS:
+            raise ValueError(f"format must be one of {', '.join(RECORD_FORMATS)}")
+        self.format = format
+        self.count = 0
+        self.quarantine: List[dict] = []
+        if isinstance(target, Path):
+            self.path = target
+            self._tmp_path: Optional[Path] = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+            self._file = open(self._tmp_path, 'w', encoding='utf-8', newline='')
+        else:
+            self.path = Path(getattr(target, 'name', '-'))
+            self._tmp_path = None
+            self._file = target
+        self._csv = None
+        if format == "csv":
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(CSV_COLUMNS)
+
+    @property
+    def quarantine_path(self) -> Path:
+        return self.path
+
+    def entry(self, name: str) -> RecordEntry:
+        return RecordEntry(name)
+
+    def add(self, name: str, record: Dict[str, Any]) -> Path:
+        """Write ``record`` and return a path naming it, for reporting."""
+        self._write(record)
+        self.count += 1
+        return self.path / name
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        if self._csv is not None:
+            self._csv.writerows(csv_rows(record))
+        else:
+            self._file.write(json.dumps(record, separators=(',', ':'), ensure_ascii=False) + '\n')
+
+    def close(self, publish: bool = True) -> None:
+        """Finish the records and, for a file target, move it into place if ``publish``."""
+        for failure in self.quarantine:
+            self._write({'v': RECORD_VERSION, 'source': failure['source'], 'error': failure['reason']})
+        if self._tmp_path is None:
+            self._file.flush()
+            return
+        self._file.close()
+        if publish:
+            os.replace(self._tmp_path, self.path)
+        else:
+            self._tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self) -> "RecordSink":
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        # Publish what was extracted even on Ctrl-C; discard only on real errors
+        self.close(publish=exc_type is None or issubclass(exc_type, KeyboardInterrupt))
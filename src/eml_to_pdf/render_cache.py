@@ -0,0 +1,182 @@
+"""Content-addressed cache of rendered PDFs, so identical documents are laid out only once."""
+
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from typing import Optional
+
+from rich.console import Console
+
+console = Console()
+
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+# Evict down to this share of the limit, so eviction does not run on every store
+EVICT_TO = 0.9
+
+
+class RenderCache:
+    """PDFs stored under the hash of everything that determines their bytes.
+
+    The key covers the document HTML, the stylesheet and the renderer
+    version, so reissued or duplicate emails that produce identical HTML are
+    rendered once; later copies are hardlinked (or copied, across
+    filesystems) from the cache. Entries are evicted least recently used
+    first once the directory grows past ``max_bytes``. Recency is kept in an
+    empty ``<key>.used`` file next to each entry rather than on the entry
+    itself, whose inode (and so mtime) is shared with every PDF hardlinked
+    from it, in this and earlier output directories. Each process tracks
+    the size from its last scan plus its own stores, so with several workers
+    the limit may be overshot by the PDFs written between scans.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size: Optional[int] = None
+
+    @staticmethod
+    def key(html_content: str, stylesheet: str, renderer: str) -> str:
+        digest = hashlib.sha256()
+        for part in (renderer, stylesheet, html_content):
+            digest.update(part.encode('utf-8', 'surrogateescape'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.pdf"
+
+    def _marker(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.used"
+
+    def _touch(self, key: str) -> None:
+        """Mark ``key`` recently used."""
+        marker = self._marker(key)
+        try:
+            os.utime(marker)
+        except FileNotFoundError:
+            try:
+                marker.touch()
+            except OSError:
+                pass
+        except OSError:
+            pass
+
+    def lookup(self, key: str) -> Optional[Path]:
+        """Return the cached PDF for ``key``, marking it recently used, or None."""
+        entry = self._entry(key)
+        if not entry.is_file():
+            self.misses += 1
+            return None
+        self._touch(key)
+        self.hits += 1
+        return entry
+
+    def fetch(self, key: str, output_path: Path) -> bool:
+        """Hardlink or copy the cached PDF for ``key`` to ``output_path``; False on a miss."""
+        entry = self.lookup(key)
+        if entry is None:
+            return False
+        output_path.unlink(missing_ok=True)
+        try:
+            os.link(entry, output_path)
+        except OSError:
+            try:
+                shutil.copyfile(entry, output_path)
+            except FileNotFoundError:
+                # Evicted by another process since the lookup
+                return False
+        return True
+
+    def read(self, key: str) -> Optional[bytes]:
+        """The cached PDF for ``key`` as bytes, or None on a miss."""
+        entry = self.lookup(key)
+        if entry is None:
+            return None
+        try:
+            return entry.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def store(self, key: str, pdf: Path) -> None:
+        """Add the rendered PDF at ``pdf`` to the cache, hardlinking it when possible."""
+        entry = self._entry(key)
+        tmp_path = entry.with_name(f".{entry.name}.{os.getpid()}.tmp")
+        try:
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.link(pdf, tmp_path)
+            except OSError:
+                shutil.copyfile(pdf, tmp_path)
+            os.replace(tmp_path, entry)
+        except OSError as e:
+            # A read-only or full cache directory only costs us the cache
+            tmp_path.unlink(missing_ok=True)
+            console.print(f"⚠️  Could not cache rendered PDF: {e}")
+            return
+        self._touch(key)
+        self._grow(entry.stat().st_size)
+
+    def store_bytes(self, key: str, data: bytes) -> None:
+        """Add a rendered PDF held in memory to the cache."""
+        entry = self._entry(key)
+        tmp_path = entry.with_name(f".{entry.name}.{os.getpid()}.tmp")
+        try:
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, entry)
+        except OSError as e:
+            tmp_path.unlink(missing_ok=True)
+            console.print(f"⚠️  Could not cache rendered PDF: {e}")
+            return
+        self._touch(key)
+        self._grow(len(data))
+
+    def _grow(self, size: int) -> None:
+        if self._size is None:
+            self._evict()
+        else:
+            self._size += size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Rescan the cache and delete least recently used entries while it is over the limit."""
+        entries = []
+        used = {}
+        total = 0
+        for shard in self._scandir(self.cache_dir):
+            for entry in self._scandir(Path(shard.path)):
+                stem, suffix = os.path.splitext(entry.name)
+                if suffix not in ('.pdf', '.used'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                if suffix == '.used':
+                    used[stem] = stat.st_mtime
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, stem))
+                total += stat.st_size
+
+        if total > self.max_bytes:
+            target = self.max_bytes * EVICT_TO
+            # Entries cached before recency markers existed fall back to their mtime
+            for _, size, key in sorted((used.get(key, mtime), size, key) for mtime, size, key in entries):
+                if total <= target:
+                    break
+                for path in (self._entry(key), self._marker(key)):
+                    path.unlink(missing_ok=True)
+                total -= size
+        self._size = total
+
+    @staticmethod
+    def _scandir(path: Path) -> list:
+        try:
+            with os.scandir(path) as entries:
+                return [entry for entry in entries if not entry.name.startswith('.')]
+        except OSError:
+            return []
@@ -0,0 +1,122 @@
+"""Selection of the latest revision of each booking, so superseded itineraries are not rendered."""
+
+import email.message
+import json
+import os
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from .models import BookingInfo
+
+REVISIONS_NAME = ".eml-to-pdf-revisions.jsonl"
+SUPERSEDED_NAME = "superseded.jsonl"
+
+
+def revision_key(booking: BookingInfo) -> Optional[tuple[str, str]]:
+    """The booking a revision belongs to: its reference and passenger, or None without a reference."""
+    if not booking.booking_ref:
+        return None
+    return booking.booking_ref.upper(), ' '.join(booking.passenger_name.upper().split())
+
+
+def message_time(msg: email.message.Message) -> float:
+    """When an email was sent, from its Date header, as a timestamp; -inf if unknown.
+
+    Dates without a usable offset are taken as UTC.
+    """
+    try:
+        sent = parsedate_to_datetime(str(msg.get('Date', '')))
+    except (TypeError, ValueError, IndexError):
+        return float('-inf')
+    if sent.tzinfo is None:
+        sent = sent.replace(tzinfo=timezone.utc)
+    return sent.timestamp()
+
+
+def write_superseded(path: Path, superseded: Iterable[tuple[Any, Any, tuple[str, str]]], append: bool = False) -> None:
+    """Write one JSON line per skipped revision, naming the email (or PDF) that supersedes it."""
+    with open(path, 'a' if append else 'w', encoding='utf-8') as f:
+        for source, latest, (booking_ref, passenger) in superseded:
+            f.write(json.dumps({
+                'source': str(source),
+                'superseded_by': str(latest),
+                'booking_ref': booking_ref,
+                'passenger': passenger,
+            }) + '\n')
+
+
+class RevisionScan:
+    """The revision of every email of a run, and the latest revision of each booking among them.
+
+    Built per batch, or in one pass before conversion when a run converts
+    its emails in several batches (a directory with tar streams, or a tar
+    stream on its own), so every batch is checked against the whole run. On
+    equal send times the earlier email wins, which is also the copy
+    ``--dedup`` keeps.
+    """
+
+    def __init__(self):
+        self.revisions: Dict[str, tuple[tuple[str, str], float]] = {}
+        # Per booking: send time, id, name and output PDF of its latest revision
+        self.latest: Dict[tuple[str, str], tuple[float, str, str, Path]] = {}
+
+    def add(self, source_id: str, source_name: str, output_file: Path, key: tuple[str, str], sent: float) -> None:
+        self.revisions[source_id] = (key, sent)
+        if key not in self.latest or sent > self.latest[key][0]:
+            self.latest[key] = (sent, source_id, source_name, output_file)
+
+
+class RevisionIndex:
+    """The revision of each booking rendered into an output directory, and when it was sent.
+
+    Stored as appended JSON lines, later lines winning, so emails of later
+    runs are compared with the revisions earlier runs rendered and an older
+    revision arriving late is not rendered over a newer one.
+    """
+
+    def __init__(self, path: Path, entries: Optional[Dict[tuple[str, str], tuple[float, str]]] = None):
+        self.path = path
+        self.entries = entries if entries is not None else {}
+        self._new: Dict[tuple[str, str], tuple[float, str]] = {}
+
+    @classmethod
+    def load(cls, output_dir: Path) -> "RevisionIndex":
+        path = output_dir / REVISIONS_NAME
+        entries = {}
+        try:
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        entries[(entry['booking_ref'], entry['passenger'])] = (entry['sent'], entry['name'])
+                    except (ValueError, KeyError, TypeError):
+                        continue  # Torn write from a crash
+        except FileNotFoundError:
+            pass
+        return cls(path, entries)
+
+    def get(self, key: tuple[str, str]) -> Optional[tuple[float, str]]:
+        """When the rendered revision of ``key`` was sent and its PDF's relative path, or None."""
+        return self.entries.get(key)
+
+    def add(self, key: tuple[str, str], sent: float, name: str) -> None:
+        if self.entries.get(key) != (sent, name):
+            self.entries[key] = self._new[key] = (sent, name)
+
+    def save(self) -> None:
+        """Append the revisions rendered since loading."""
+        if not self._new:
+            return
+        with open(self.path, 'a+', encoding='utf-8') as f:
+            if f.tell() > 0:
+                # Terminate a torn final line so it cannot swallow the next entry
+                f.seek(f.tell() - 1)
+                if f.read(1) != '\n':
+                    f.write('\n')
+            for (booking_ref, passenger), (sent, name) in self._new.items():
+                f.write(json.dumps({'booking_ref': booking_ref, 'passenger': passenger, 'sent': sent, 'name': name}) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self._new = {}
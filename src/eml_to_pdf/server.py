@@ -0,0 +1,366 @@
+"""Long-running conversion service backed by a pool of pre-warmed worker processes."""
+
+import json
+import os
+import queue
+import socketserver
+import threading
+import time
+from contextlib import contextmanager
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing.connection import wait
+from pathlib import Path
+from typing import Optional, Dict, Any, Iterator
+
+from rich.console import Console
+
+from . import __version__
+from .supervisor import _Worker
+
+console = Console()
+
+# Larger request bodies are rejected before they are read
+MAX_REQUEST_BYTES = 64 * 1024 * 1024
+# How long a new worker may take to import WeasyPrint and render its warm-up PDF
+READY_TIMEOUT = 120.0
+# How often a request waiting for a worker checks that one can still come
+WORKER_WAIT_INTERVAL = 1.0
+
+
+class Overloaded(Exception):
+    """Every worker is busy and the queue is full; the client should retry later."""
+
+
+class ConversionError(Exception):
+    """An email could not be converted; ``status`` is the HTTP status to answer with."""
+
+    def __init__(self, message: str, status: HTTPStatus):
+        super().__init__(message)
+        self.status = status
+
+
+class WarmPool:
+    """Pre-warmed worker processes shared by concurrent requests.
+
+    Each worker imports WeasyPrint and renders a throwaway PDF before it takes
+    any request, so a request only pays for parsing and rendering its email.
+    At most ``processes + queue_size`` requests are admitted at once: the
+    first ``processes`` run, the rest wait for a free worker, and any beyond
+    that are refused with ``Overloaded`` instead of piling up. The HTTP
+    handler takes its slot with ``admit`` before reading the request body, so
+    at most that many bodies are held in memory however many clients are
+    uploading. Workers that
+    crash, hang past ``task_timeout`` or exceed ``memory_limit`` are replaced
+    in the background, and ``max_tasks_per_child`` recycles them.
+    """
+
+    def __init__(
+        self,
+        processes: int,
+        converter_kwargs: Dict[str, Any],
+        queue_size: int = 16,
+        task_timeout: Optional[float] = None,
+        memory_limit: Optional[int] = None,
+        max_tasks_per_child: Optional[int] = None,
+    ):
+        self.processes = max(processes, 1)
+        self.converter_kwargs = converter_kwargs
+        self.queue_size = queue_size
+        self.task_timeout = task_timeout
+        self.memory_limit = memory_limit
+        self.max_tasks_per_child = max_tasks_per_child
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._slots = threading.BoundedSemaphore(self.processes + queue_size)
+        self._lock = threading.Lock()
+        self._closed = False
+        self.workers = 0
+        # Consecutive workers that failed to start; reset when one starts
+        self.start_failures = 0
+        self.in_flight = 0
+        self.counters = {
+            'converted': 0, 'failed': 0, 'timed_out': 0, 'crashed': 0, 'rejected': 0, 'unavailable': 0,
+        }
+        self.seconds_total = 0.0
+
+    def start(self) -> None:
+        """Start every worker and wait until they are all warm."""
+        workers = [_Worker(self.converter_kwargs, self.memory_limit, warm=True) for _ in range(self.processes)]
+        for worker in workers:
+            self._add_when_ready(worker)
+        if not self.workers:
+            raise RuntimeError("no worker process started successfully")
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            worker.stop()
+
+    def convert(self, data: bytes) -> bytes:
+        """Convert one email to PDF bytes on a warm worker."""
+        with self.admit():
+            return self.convert_admitted(data)
+
+    @contextmanager
+    def admit(self) -> Iterator[None]:
+        """Hold one request slot for the block; raises ``Overloaded`` when none is free."""
+        if not self._slots.acquire(blocking=False):
+            self._count('rejected')
+            raise Overloaded()
+        started = time.monotonic()
+        with self._lock:
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self.seconds_total += time.monotonic() - started
+            self._slots.release()
+
+    def convert_admitted(self, data: bytes) -> bytes:
+        """Like ``convert``, for a caller already holding a slot from ``admit``."""
+        worker = self._next_worker()
+        pdf, error, render_failed = self._run(worker, data)
+        if pdf is None:
+            self._count('failed')
+            # A broken email is the client's problem; a failing renderer is ours
+            status = HTTPStatus.INTERNAL_SERVER_ERROR if render_failed else HTTPStatus.UNPROCESSABLE_ENTITY
+            raise ConversionError(error or "conversion failed", status)
+        self._count('converted')
+        return pdf
+
+    def _next_worker(self) -> _Worker:
+        """Wait for an idle worker, giving up once none is alive and replacements fail to start."""
+        while True:
+            try:
+                return self._idle.get(timeout=WORKER_WAIT_INTERVAL)
+            except queue.Empty:
+                if self._closed or (self.workers == 0 and self.start_failures > 0):
+                    self._count('unavailable')
+                    raise ConversionError("no worker process available", HTTPStatus.SERVICE_UNAVAILABLE)
+    
+    def _run(self, worker: _Worker, data: bytes) -> tuple[Optional[bytes], Optional[str], bool]:
+        """Run one request on ``worker`` and hand the worker (or its replacement) back."""
+        worker.submit(0, data)
+        ready = wait([worker.conn, worker.process.sentinel], self.task_timeout)
+        if worker.conn in ready:
+            try:
+                outcome = worker.conn.recv()
+            except (EOFError, OSError):
+                reason = worker.death_reason()
+                self._replace(worker, graceful=False)
+                self._count('crashed')
+                raise ConversionError(reason, HTTPStatus.INTERNAL_SERVER_ERROR)
+            worker.index = None
+            worker.tasks_done += 1
+            if self.max_tasks_per_child and worker.tasks_done >= self.max_tasks_per_child:
+                self._replace(worker)
+            else:
+                self._idle.put(worker)
+            return outcome
+        if worker.process.sentinel in ready:
+            reason = worker.death_reason()
+            self._replace(worker, graceful=False)
+            self._count('crashed')
+            raise ConversionError(reason, HTTPStatus.INTERNAL_SERVER_ERROR)
+        self._replace(worker, graceful=False)
+        self._count('timed_out')
+        raise ConversionError(f"timed out after {self.task_timeout:g}s", HTTPStatus.GATEWAY_TIMEOUT)
+
+    def _replace(self, worker: _Worker, graceful: bool = True) -> None:
+        """Stop ``worker`` and warm up a replacement without holding up the request."""
+        with self._lock:
+            self.workers -= 1
+
+        def respawn():
+            worker.stop(graceful)
+            while not self._closed:
+                if self._add_when_ready(_Worker(self.converter_kwargs, self.memory_limit, warm=True)):
+                    return
+                time.sleep(1)
+
+        threading.Thread(target=respawn, daemon=True).start()
+
+    def _add_when_ready(self, worker: _Worker) -> bool:
+        """Wait for ``worker`` to finish warming up and make it available."""
+        ready = wait([worker.conn, worker.process.sentinel], READY_TIMEOUT)
+        failure = None
+        if worker.conn in ready:
+            try:
+                worker.conn.recv()
+            except (EOFError, OSError):
+                failure = worker.death_reason()
+        else:
+            failure = worker.death_reason() if ready else f"not ready after {READY_TIMEOUT:g}s"
+        if failure is not None or self._closed:
+            if failure is not None:
+                console.print(f"⚠️  Worker failed to start: {failure}")
+                with self._lock:
+                    self.start_failures += 1
+            worker.stop(graceful=False)
+            return False
+        with self._lock:
+            self.workers += 1
+            self.start_failures = 0
+        self._idle.put(worker)
+        return True
+
+    def _count(self, outcome: str) -> None:
+        with self._lock:
+            self.counters[outcome] += 1
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            'status': 'ok' if self.workers else 'unavailable' if self.start_failures else 'starting',
+            'workers': self.workers,
+            'idle_workers': self._idle.qsize(),
+            'in_flight': self.in_flight,
+        }
+
+    def metrics(self) -> str:
+        """Counters and gauges in the Prometheus text exposition format."""
+        with self._lock:
+            lines = [
+                '# HELP eml_to_pdf_requests_total Conversion requests by outcome.',
+                '# TYPE eml_to_pdf_requests_total counter',
+            ]
+            lines += [f'eml_to_pdf_requests_total{{outcome="{name}"}} {value}' for name, value in self.counters.items()]
+            lines += [
+                '# HELP eml_to_pdf_request_seconds_total Time spent on admitted requests, including upload and queueing.',
+                '# TYPE eml_to_pdf_request_seconds_total counter',
+                f'eml_to_pdf_request_seconds_total {self.seconds_total:.6f}',
+                '# HELP eml_to_pdf_in_flight Admitted requests running or waiting for a worker.',
+                '# TYPE eml_to_pdf_in_flight gauge',
+                f'eml_to_pdf_in_flight {self.in_flight}',
+                '# HELP eml_to_pdf_queue_capacity Requests admitted beyond the number of workers.',
+                '# TYPE eml_to_pdf_queue_capacity gauge',
+                f'eml_to_pdf_queue_capacity {self.queue_size}',
+                '# HELP eml_to_pdf_workers Warm worker processes.',
+                '# TYPE eml_to_pdf_workers gauge',
+                f'eml_to_pdf_workers {self.workers}',
+                '# HELP eml_to_pdf_idle_workers Warm worker processes waiting for a request.',
+                '# TYPE eml_to_pdf_idle_workers gauge',
+                f'eml_to_pdf_idle_workers {self._idle.qsize()}',
+            ]
+        return '\n'.join(lines) + '\n'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """POST /convert, GET /health and GET /metrics."""
+
+    server_version = f"eml-to-pdf/{__version__}"
+    # Keep connections open so clients can send one request after another
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        pool: WarmPool = self.server.pool
+        if self.path == '/health':
+            health = pool.health()
+            status = HTTPStatus.OK if health['workers'] else HTTPStatus.SERVICE_UNAVAILABLE
+            self._send(status, json.dumps(health).encode('utf-8'), 'application/json')
+        elif self.path == '/metrics':
+            self._send(HTTPStatus.OK, pool.metrics().encode('utf-8'), 'text/plain; version=0.0.4')
+        else:
+            self._send_error(HTTPStatus.NOT_FOUND, "not found")
+
+    def do_POST(self) -> None:
+        if self.path != '/convert':
+            self._send_error(HTTPStatus.NOT_FOUND, "not found")
+            return
+        try:
+            length = int(self.headers.get('Content-Length', ''))
+        except ValueError:
+            self.close_connection = True
+            self._send_error(HTTPStatus.LENGTH_REQUIRED, "Content-Length required")
+            return
+        if length < 0:
+            self.close_connection = True
+            self._send_error(HTTPStatus.BAD_REQUEST, "invalid Content-Length")
+            return
+        if length > MAX_REQUEST_BYTES:
+            self.close_connection = True
+            self._send_error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"email larger than {MAX_REQUEST_BYTES} bytes")
+            return
+
+        pool: WarmPool = self.server.pool
+        try:
+            # Admitted before the body is read, so refused uploads never take memory
+            with pool.admit():
+                data = self.rfile.read(length)
+                if len(data) < length:
+                    # The client went away mid-upload
+                    self.close_connection = True
+                    return
+                pdf = pool.convert_admitted(data)
+        except Overloaded:
+            # The unread body is still on the connection
+            self.close_connection = True
+            self._send_error(HTTPStatus.SERVICE_UNAVAILABLE, "server busy, retry later", {'Retry-After': '1'})
+        except ConversionError as e:
+            self._send_error(e.status, str(e))
+        else:
+            self._send(HTTPStatus.OK, pdf, 'application/pdf')
+
+    def _send(self, status: HTTPStatus, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: HTTPStatus, message: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self._send(status, json.dumps({'error': message}).encode('utf-8'), 'application/json', headers)
+
+    def address_string(self) -> str:
+        # Unix socket peers have no address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        console.print(f"{self.address_string()} - {format % args}", markup=False, highlight=False)
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(
+    pool: WarmPool,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    socket_path: Optional[Path] = None,
+) -> None:
+    """Warm up ``pool`` and serve requests on a TCP port or a unix socket until interrupted."""
+    console.print(f"🔥 Warming up {pool.processes} worker processes...")
+    pool.start()
+
+    if socket_path is not None:
+        if socket_path.is_socket():
+            # Left behind by a previous server that did not shut down cleanly
+            socket_path.unlink()
+        server = _UnixHTTPServer(str(socket_path), _Handler)
+        address = f"unix:{socket_path}"
+    else:
+        server = ThreadingHTTPServer((host, port), _Handler)
+        address = f"http://{host}:{server.server_address[1]}"
+    server.pool = pool
+
+    console.print(f"🚀 Serving on [bold green]{address}[/bold green] (POST /convert, GET /health, GET /metrics)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        console.print("\n⏹  Shutting down")
+    finally:
+        server.server_close()
+        pool.close()
+        if socket_path is not None:
+            try:
+                os.unlink(socket_path)
+            except OSError:
+                pass
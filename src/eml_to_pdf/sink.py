@@ -0,0 +1,98 @@
+"""Single zip or tar archive as the output of a batch, instead of loose PDF files."""
+
+import io
+import json
+import os
+import tarfile
+import time
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, List
+
+from .journal import QUARANTINE_NAME
+
+ZIP_SUFFIXES = ('.zip',)
+TAR_MODES = {'.tar': 'w', '.tar.gz': 'w:gz', '.tgz': 'w:gz', '.tar.xz': 'w:xz', '.txz': 'w:xz'}
+
+
+def is_archive_output(path: Path) -> bool:
+    return path.name.lower().endswith(ZIP_SUFFIXES + tuple(TAR_MODES))
+
+
+@dataclass(frozen=True)
+class ArchiveEntry:
+    """Where a task's PDF goes inside the output archive (a relative POSIX path)."""
+    name: str
+
+
+class ArchiveSink:
+    """Writes PDFs into one zip or tar archive as they arrive.
+
+    Only the batch's parent process writes, so any number of workers can feed
+    it; each PDF is written as soon as it is received and then dropped, so
+    memory stays bounded by the PDFs in flight. The archive is built under a
+    temporary name and renamed into place on close, so readers never see a
+    partial archive.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.count = 0
+        self.quarantine: List[dict] = []
+        self._tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        self._names: set[str] = set()
+        lower = path.name.lower()
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._tar: Optional[tarfile.TarFile] = None
+        if lower.endswith(ZIP_SUFFIXES):
+            # PDF content streams are already compressed
+            self._zip = zipfile.ZipFile(self._tmp_path, 'w', zipfile.ZIP_STORED, allowZip64=True)
+        else:
+            mode = next(mode for suffix, mode in TAR_MODES.items() if lower.endswith(suffix))
+            self._tar = tarfile.open(self._tmp_path, mode)
+
+    @property
+    def quarantine_path(self) -> Path:
+        return self.path / QUARANTINE_NAME
+
+    def entry(self, name: str) -> ArchiveEntry:
+        return ArchiveEntry(name)
+
+    def add(self, name: str, data: bytes) -> Path:
+        """Store ``data`` as ``name`` and return the entry's path for reporting."""
+        if name in self._names:
+            # Never write duplicate members; later readers would see only one
+            stem, dot, suffix = name.rpartition('.')
+            name = f"{stem}-{self.count}.{suffix}" if dot else f"{name}-{self.count}"
+        self._names.add(name)
+        if self._zip is not None:
+            self._zip.writestr(zipfile.ZipInfo(name, time.localtime()[:6]), data)
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            self._tar.addfile(info, io.BytesIO(data))
+        self.count += 1
+        return self.path / name
+
+    def close(self, publish: bool = True) -> None:
+        """Finish the archive and, if ``publish``, move it into place."""
+        if self.quarantine:
+            data = ''.join(json.dumps(entry) + '\n' for entry in self.quarantine).encode('utf-8')
+            self.add(QUARANTINE_NAME, data)
+        if self._zip is not None:
+            self._zip.close()
+        else:
+            self._tar.close()
+        if publish:
+            os.replace(self._tmp_path, self.path)
+        else:
+            self._tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self) -> "ArchiveSink":
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        # Publish what was converted even on Ctrl-C; discard only on real errors
+        self.close(publish=exc_type is None or issubclass(exc_type, KeyboardInterrupt))
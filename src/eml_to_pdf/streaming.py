@@ -0,0 +1,147 @@
+"""Streaming MIME reader that keeps only the text parts of an email."""
+
+import email.message
+import os
+import re
+from email.parser import BytesHeaderParser
+from pathlib import Path
+from typing import BinaryIO, List
+
+TEXT_TYPES = ("text/plain", "text/html")
+SKIP_BLOCK_SIZE = 1 << 20
+# Boundaries are at most 70 characters (RFC 2046), plus dashes and padding
+MAX_BOUNDARY_LINE = 1024
+
+# Same test the standard feed parser uses to tell header lines from body lines
+_HEADER_LINE_RE = re.compile(rb'^(From |[\041-\071\073-\176]*:|[\t ])')
+
+
+def read_text_message(path: Path) -> email.message.Message:
+    """Parse an EML file keeping only its ``text/plain`` and ``text/html`` bodies.
+
+    The file is read line by line and MIME boundaries are tracked directly, so
+    attachments and other non-text parts are skipped without ever being held
+    in memory; peak memory is bounded by the size of the text parts. The
+    returned message has the top-level headers, and when multipart, the text
+    parts (flattened) as its payload, which is all the converter needs.
+    """
+    with open(path, 'rb') as f:
+        return parse_text_message(f)
+
+
+def parse_text_message(f: BinaryIO) -> email.message.Message:
+    """Like ``read_text_message``, but from an open, seekable binary file."""
+    root = _read_headers(f)
+    parts: List[email.message.Message] = []
+    _consume(f, root, frozenset(), parts)
+    if root.get_content_maintype() != 'text':
+        root.set_payload(parts)
+    return root
+
+
+def _read_headers(f: BinaryIO) -> email.message.Message:
+    """Read and parse a header block, leaving ``f`` at the start of the body."""
+    lines = []
+    while True:
+        position = f.tell()
+        line = f.readline()
+        if not line or line in (b'\n', b'\r\n'):
+            break
+        if not _HEADER_LINE_RE.match(line):
+            # Missing blank line: this already belongs to the body
+            f.seek(position)
+            break
+        lines.append(line)
+    return BytesHeaderParser().parsebytes(b''.join(lines))
+
+
+def _delimiter(line: bytes) -> bytes:
+    # Boundary lines may carry trailing whitespace (RFC 2046)
+    return line.rstrip(b' \t\r\n')
+
+
+def _consume(f: BinaryIO, msg: email.message.Message, ends: frozenset, parts: List[email.message.Message]) -> bytes:
+    """Read the body of ``msg``, collecting text parts into ``parts``.
+
+    ``ends`` holds the boundary lines of every enclosing multipart. Returns
+    the boundary line that ended this body, or b'' at end of file.
+    """
+    maintype = msg.get_content_maintype()
+    boundary = msg.get_boundary() if maintype == 'multipart' else None
+
+    if boundary:
+        delimiter = b'--' + boundary.encode('ascii', 'surrogateescape')
+        close = delimiter + b'--'
+        inner_ends = ends | {delimiter, close}
+        # Skip the preamble
+        line = _skip(f, inner_ends)
+        while _delimiter(line) == delimiter:
+            line = _consume(f, _read_headers(f), inner_ends, parts)
+        if _delimiter(line) == close:
+            # Skip the epilogue
+            line = _skip(f, ends)
+        return line
+
+    if maintype == 'message' and msg.get_content_subtype() != 'delivery-status':
+        # Attached or forwarded message: its text parts count too
+        return _consume(f, _read_headers(f), ends, parts)
+
+    if msg.get_content_type() not in TEXT_TYPES:
+        return _skip(f, ends)
+
+    body = []
+    line = b''
+    for line in f:
+        if ends and _delimiter(line) in ends:
+            break
+        body.append(line)
+    else:
+        line = b''
+    data = b''.join(body)
+    if line:
+        # The line break before a boundary belongs to the boundary
+        if data.endswith(b'\r\n'):
+            data = data[:-2]
+        elif data.endswith(b'\n'):
+            data = data[:-1]
+    # Same representation the standard parser uses for raw bytes
+    msg.set_payload(data.decode('ascii', 'surrogateescape'))
+    parts.append(msg)
+    return line
+
+
+def _skip(f: BinaryIO, ends: frozenset) -> bytes:
+    """Discard everything up to and including the next boundary line in ``ends``.
+
+    Boundary lines always start with "--", so whole blocks are scanned for
+    line starts with that prefix instead of reading the skipped part line by line.
+    """
+    if not ends:
+        f.seek(0, os.SEEK_END)
+        return b''
+
+    at_line_start = True
+    while True:
+        start = f.tell()
+        block = f.read(SKIP_BLOCK_SIZE)
+        if not block:
+            return b''
+        position = 0 if at_line_start and block.startswith(b'--') else _next_dashes(block, 0)
+        while position >= 0:
+            f.seek(start + position)
+            line = f.readline(MAX_BOUNDARY_LINE)
+            if _delimiter(line) in ends:
+                return line
+            position = _next_dashes(block, position)
+        if len(block) < SKIP_BLOCK_SIZE:
+            f.seek(0, os.SEEK_END)
+            return b''
+        # Overlap the next block so a "\n--" split across blocks is still found
+        f.seek(start + len(block) - 2)
+        at_line_start = False
+
+
+def _next_dashes(block: bytes, position: int) -> int:
+    """Offset of the next line in ``block`` after ``position`` that starts with "--", or -1."""
+    index = block.find(b'\n--', position)
+    return index + 1 if index >= 0 else -1
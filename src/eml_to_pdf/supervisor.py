@@ -0,0 +1,190 @@
+"""Supervised worker processes that contain crashes, hangs and leaks to a single file."""
+
+import multiprocessing
+import signal
+import time
+from collections import deque
+from multiprocessing.connection import Connection, wait
+from pathlib import Path
+from typing import Optional, Dict, Any, Iterator, Union
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# A PDF path (or PDF bytes for archive output) or None, and the failure message
+Outcome = tuple[Union[Path, bytes, None], Optional[str]]
+
+
+def _worker_main(
+    conn: Connection, converter_kwargs: Dict[str, Any], memory_limit: Optional[int], warm: bool = False
+) -> None:
+    """Worker loop: build one warm converter and convert tasks until told to stop.
+
+    With ``warm``, the worker renders a throwaway PDF first and then sends
+    None to say it is ready, so its first real task pays no start-up cost.
+    A task that is just EML bytes is a server request (see
+    ``EMLToPDFConverter._convert_request``).
+    """
+    # Ctrl-C reaches the whole process group; let the supervisor decide what to do
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if memory_limit and resource is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+    from .converter import EMLToPDFConverter
+    converter = EMLToPDFConverter(**converter_kwargs)
+    if warm:
+        converter.warm_up()
+        conn.send(None)
+
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        if isinstance(task, bytes):
+            conn.send(converter._convert_request(task))
+        else:
+            conn.send(converter._convert_task(task))
+    converter.sync_outputs()
+
+
+class _Worker:
+    """A worker process, its pipe and the task it is currently running."""
+
+    def __init__(self, converter_kwargs: Dict[str, Any], memory_limit: Optional[int], warm: bool = False):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=_worker_main,
+            args=(child_conn, converter_kwargs, memory_limit, warm),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.index: Optional[int] = None
+        self.started = 0.0
+        self.tasks_done = 0
+
+    def submit(self, index: int, task: Union[tuple[Any, Path], bytes]) -> None:
+        self.index = index
+        self.started = time.monotonic()
+        self.conn.send(task)
+
+    def death_reason(self) -> str:
+        self.process.join(timeout=1)
+        code = self.process.exitcode
+        if code is not None and code < 0:
+            try:
+                return f"worker crashed ({signal.Signals(-code).name})"
+            except ValueError:
+                return f"worker crashed (signal {-code})"
+        return f"worker exited unexpectedly (exit code {code})"
+
+    def stop(self, graceful: bool = True) -> None:
+        if graceful and self.process.is_alive():
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+            self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class SupervisedPool:
+    """Process pool that survives worker crashes, hangs and memory blow-ups.
+
+    Every file runs in a worker process under an optional wall-clock timeout
+    and address-space limit (RLIMIT_AS). A worker that hangs past the timeout
+    is killed, one that segfaults or is OOM-killed is detected through its
+    process sentinel, and either way the file fails with the reason and a
+    fresh worker takes its place. Workers are also recycled after
+    ``max_tasks_per_child`` files to contain slow leaks.
+    """
+
+    def __init__(
+        self,
+        processes: int,
+        converter_kwargs: Dict[str, Any],
+        task_timeout: Optional[float] = None,
+        memory_limit: Optional[int] = None,
+        max_tasks_per_child: Optional[int] = None,
+    ):
+        self.processes = max(processes, 1)
+        self.converter_kwargs = converter_kwargs
+        self.task_timeout = task_timeout
+        self.memory_limit = memory_limit
+        self.max_tasks_per_child = max_tasks_per_child
+        # Bounds the out-of-order results (e.g. PDF bytes) held behind a slow task
+        self.max_buffered = 4 * self.processes
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self.converter_kwargs, self.memory_limit)
+
+    def map(self, tasks: list[tuple[Any, Path]]) -> Iterator[Outcome]:
+        """Convert ``tasks``, yielding a (pdf, error) outcome per task in input order."""
+        pending = deque(enumerate(tasks))
+        results: Dict[int, Outcome] = {}
+        next_index = 0
+        workers: list[_Worker] = []
+
+        try:
+            while next_index < len(tasks):
+                # Keep the pool full and every idle worker busy
+                idle = sum(1 for worker in workers if worker.index is None)
+                while len(workers) < self.processes and idle < len(pending):
+                    workers.append(self._spawn())
+                    idle += 1
+                for worker in workers:
+                    # Finished results wait here until every earlier task is done;
+                    # stop handing out work while too many are held
+                    if worker.index is None and pending and len(results) < self.max_buffered:
+                        worker.submit(*pending.popleft())
+
+                busy = [worker for worker in workers if worker.index is not None]
+                timeout = None
+                if self.task_timeout:
+                    now = time.monotonic()
+                    timeout = max(0.0, min(worker.started + self.task_timeout - now for worker in busy))
+                ready = set(wait(
+                    [worker.conn for worker in busy] + [worker.process.sentinel for worker in busy],
+                    timeout,
+                ))
+
+                now = time.monotonic()
+                for worker in busy:
+                    index = worker.index
+                    if worker.conn in ready:
+                        try:
+                            results[index] = worker.conn.recv()
+                        except (EOFError, OSError):
+                            results[index] = (None, worker.death_reason())
+                            self._retire(workers, worker, graceful=False)
+                            continue
+                        worker.index = None
+                        worker.tasks_done += 1
+                        if self.max_tasks_per_child and worker.tasks_done >= self.max_tasks_per_child:
+                            self._retire(workers, worker)
+                    elif worker.process.sentinel in ready:
+                        results[index] = (None, worker.death_reason())
+                        self._retire(workers, worker, graceful=False)
+                    elif self.task_timeout and now - worker.started >= self.task_timeout:
+                        results[index] = (None, f"timed out after {self.task_timeout:g}s")
+                        self._retire(workers, worker, graceful=False)
+
+                while next_index in results:
+                    yield results.pop(next_index)
+                    next_index += 1
+        finally:
+            for worker in workers:
+                worker.stop(graceful=worker.index is None)
+
+    @staticmethod
+    def _retire(workers: list[_Worker], worker: _Worker, graceful: bool = True) -> None:
+        workers.remove(worker)
+        worker.stop(graceful)
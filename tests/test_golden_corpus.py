@@ -0,0 +1,43 @@
+"""Flight parsing output pinned against a golden corpus of Amadeus itinerary bodies.
+
+Each ``golden/*.txt`` body has a ``.json`` list of the FlightInfo fields the
+original parser produced for it. Regenerate the expected output only for a
+deliberate parsing change, together with a PARSER_VERSION bump.
+"""
+
+import json
+import unittest
+from dataclasses import asdict
+from pathlib import Path
+
+from src.eml_to_pdf.converter import PARSE_MODES, EMLToPDFConverter
+
+GOLDEN_DIR = Path(__file__).parent / "golden"
+
+
+def golden_cases() -> list[tuple[str, str, list]]:
+    cases = []
+    for body_path in sorted(GOLDEN_DIR.glob("*.txt")):
+        # Keep CRLF bodies as they are
+        with open(body_path, encoding='utf-8', newline='') as f:
+            body = f.read()
+        expected = json.loads(body_path.with_suffix('.json').read_text(encoding='utf-8'))
+        cases.append((body_path.stem, body, expected))
+    return cases
+
+
+class GoldenCorpusTest(unittest.TestCase):
+    def test_corpus_is_present(self):
+        self.assertGreaterEqual(len(golden_cases()), 8)
+
+    def test_parse_flights_matches_golden_output(self):
+        for mode in PARSE_MODES:
+            converter = EMLToPDFConverter(parse_mode=mode)
+            for name, body, expected in golden_cases():
+                with self.subTest(mode=mode, body=name):
+                    flights = [asdict(flight) for flight in converter.parse_flights(body)]
+                    self.assertEqual(flights, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+"""The linear-time flight section splitter: equivalence with the regex and its linear bound."""
+
+import random
+import signal
+import time
+import unittest
+
+from src.eml_to_pdf.converter import (
+    EMLToPDFConverter, ParseTimeout, _FLIGHT_SECTION_RE, _iter_flight_sections_linear, _time_budget,
+)
+
+# Fragments the section regex reacts to, plus filler, so random bodies hit
+# header candidates, dashes, airline runs and every terminator
+TOKENS = (
+    'FLIGHT', 'flight', 'FLIGHT ', ' ', '  ', '\t', '\n', '\r\n', '-', ' - ', '--', 'AB', 'x', '12', '7',
+    '(S)', 'FLIGHT(S) CALCULATED', 'GENERAL INFORMATION', 'FLIGHT TICKET', 'TICKET', 'CALCULATED', '/', ':', '.',
+)
+
+
+def regex_sections(text: str) -> list[str]:
+    return [match.group(0) for match in _FLIGHT_SECTION_RE.finditer(text)]
+
+
+def best_time(func, *args, repeat: int = 3) -> float:
+    """Fastest of ``repeat`` runs, to keep scheduling noise out of the ratios."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def flight_header_lines(count: int) -> str:
+    # Every line is a header candidate whose column run never reaches a dash
+    return "FLIGHT 1\n" * count
+
+
+def meal_continuation(count: int) -> str:
+    # The meal pattern's lookahead never succeeds on an unterminated continuation
+    return "FLIGHT XX 123 - AIRLINE WED 27 AUGUST 2025\nMEAL: " + "A\n " * count + "1"
+
+
+class LinearSectionsTest(unittest.TestCase):
+    def test_matches_regex_on_random_bodies(self):
+        rng = random.Random(20250827)
+        for _ in range(5000):
+            text = ''.join(rng.choice(TOKENS) for _ in range(rng.randint(0, 40)))
+            with self.subTest(text=text):
+                self.assertEqual(list(_iter_flight_sections_linear(text)), regex_sections(text))
+
+    def test_matches_regex_on_adversarial_bodies(self):
+        for text in (
+            flight_header_lines(200),
+            "FLIGHT 1 " * 200,
+            "FLIGHT 1 " * 200 + "- X",
+            "FLIGHT   -  - A -\n" * 50,
+            meal_continuation(200),
+            "FLIGHT AB 1 - X\n",
+            "FLIGHT AB 1 - X",
+            "",
+        ):
+            with self.subTest(text=text[:40]):
+                self.assertEqual(list(_iter_flight_sections_linear(text)), regex_sections(text))
+
+
+class LinearBoundTest(unittest.TestCase):
+    # Quadrupling the input must cost well under the 16x of quadratic work
+    MAX_RATIO = 8
+
+    def assert_linear(self, make_body):
+        converter = EMLToPDFConverter(parse_mode="linear")
+        small = best_time(converter.parse_flights, make_body(4000))
+        large = best_time(converter.parse_flights, make_body(16000))
+        self.assertLess(large, max(small, 0.005) * self.MAX_RATIO)
+
+    def test_flight_header_lines_scale_linearly(self):
+        self.assert_linear(flight_header_lines)
+
+    def test_meal_continuation_scales_linearly(self):
+        self.assert_linear(meal_continuation)
+
+    @unittest.skipUnless(hasattr(signal, 'setitimer'), "needs an interval timer")
+    def test_regex_mode_only_stops_at_the_parse_budget(self):
+        converter = EMLToPDFConverter(parse_mode="regex")
+        with self.assertRaises(ParseTimeout):
+            with _time_budget(0.5) as deadline:
+                converter.parse_flights(meal_continuation(500), deadline)
+
+
+if __name__ == '__main__':
+    unittest.main()
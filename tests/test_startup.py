@@ -0,0 +1,44 @@
+"""CLI start-up stays fast: WeasyPrint is not imported until the first render."""
+
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+CLI_MODULE = "src.eml_to_pdf.cli"
+# Cumulative import time of the CLI module; about 130 ms when this was set
+IMPORT_BUDGET_MS = 250
+
+
+def import_cli() -> tuple[int, list[str]]:
+    """Import the CLI in a fresh interpreter; return its cumulative import time in µs and any WeasyPrint modules."""
+    result = subprocess.run(
+        [
+            sys.executable, "-X", "importtime", "-c",
+            f"import sys, {CLI_MODULE}; "
+            "print(' '.join(name for name in sys.modules if name.split('.')[0] == 'weasyprint'))",
+        ],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+    )
+    for line in result.stderr.splitlines():
+        # "import time: <self us> | <cumulative us> | <module>", nested modules indented
+        fields = line.split('|')
+        if line.startswith('import time:') and len(fields) == 3 and fields[2].rstrip() == f" {CLI_MODULE}":
+            return int(fields[1]), result.stdout.split()
+    raise AssertionError(f"no import time reported for {CLI_MODULE}:\n{result.stderr}")
+
+
+class StartupTest(unittest.TestCase):
+    def test_cli_does_not_import_weasyprint(self):
+        _, weasyprint_modules = import_cli()
+        self.assertEqual(weasyprint_modules, [])
+
+    def test_cli_imports_within_budget(self):
+        # Best of three, so a busy machine does not fail the check
+        best_us = min(import_cli()[0] for _ in range(3))
+        self.assertLess(best_us / 1000, IMPORT_BUDGET_MS)
+
+
+if __name__ == '__main__':
+    unittest.main()